@@ -2,7 +2,7 @@ import types
 
 import aiohttp_jinja2
 import jinja2
-from aiohttp import BasicAuth, ClientSession, ClientTimeout, TCPConnector
+from aiohttp import BasicAuth
 from aiohttp.client_exceptions import (ClientConnectionError,
                                        ClientConnectorError,
                                        ClientResponseError)
@@ -11,38 +11,36 @@ from aiohttp_utils import negotiation, routing
 from structlog import get_logger
 from app import i18n
 
+from . import cache
 from . import config
+from . import deadline
 from . import error_handlers
 from . import flash
+from . import fulfilments
+from . import http_clients
 from . import google_analytics
 from . import domains
 from . import jwt
+from . import request
 from . import routes
 from . import security
 from . import session
+from . import session_codec
 from . import settings
+from . import templating
 from . import trace
+from . import warm_up
 from .app_logging import logger_initial_config
 
 logger = get_logger('respondent-home')
 
 
-async def on_startup(app):
-    # by limiting keep-alive, we help prevent errors during RHSvc scale-back.
-    conn = TCPConnector(keepalive_timeout=5)
-    app.http_session_pool = ClientSession(connector=conn, timeout=ClientTimeout(total=30), trust_env=True)
-
-
-async def on_cleanup(app):
-    await app.http_session_pool.close()
-
-
 async def check_services(app: Application) -> bool:
     for service_name in app.service_status_urls:
         url = app.service_status_urls[service_name]
         logger.info('making health check get request', url=url)
         try:
-            async with app.http_session_pool.get(url) as resp:
+            async with app.http_clients.session_for(url).get(url) as resp:
                 resp.raise_for_status()
         except (ClientConnectorError, ClientConnectionError,
                 ClientResponseError):
@@ -50,9 +48,10 @@ async def check_services(app: Application) -> bool:
                          config=service_name,
                          url=url)
             return False
-    else:
-        logger.info('all required services are healthy')
-        return True
+    if not await session.check_redis(app):
+        return False
+    logger.info('all required services are healthy')
+    return True
 
 
 def jinja_filter_set_attributes(dictionary, attributes):
@@ -81,7 +80,7 @@ def create_app(config_name=None) -> Application:
     app = Application(
         debug=settings.DEBUG,
         middlewares=[
-            security.nonce_middleware,
+            deadline.deadline_middleware,
             session.setup(app_config),
             flash.flash_middleware,
             trace.trace_middleware
@@ -103,6 +102,28 @@ def create_app(config_name=None) -> Application:
             'ADDRESS_INDEX_SVC_URL', 'AD_LOOK_UP_SVC_URL'
         ])
 
+    # A connection pool for each upstream service, by limiting keep-alive we help prevent errors during RHSvc
+    # scale-back
+    app.http_clients = http_clients.UpstreamClients.from_config(app)
+
+    # Shared cache of Address Index postcode results, keyed by (postcode, epoch)
+    app.postcode_cache = cache.TTLCache(int(app['ADDRESS_INDEX_CACHE_SIZE']), int(app['ADDRESS_INDEX_CACHE_TTL']))
+
+    # Shared cache of rendered pages that only vary with their URL, keyed by URL
+    app.page_cache = cache.TTLCache(int(app['PAGE_CACHE_SIZE']), int(app['PAGE_CACHE_TTL']))
+
+    # Coalesces identical concurrent upstream GETs
+    app.singleflight = request.SingleFlight()
+
+    # In memory fulfilment catalogue, refreshed in the background
+    app.fulfilment_catalogue = fulfilments.FulfilmentCatalogue(int(app['FULFILMENT_CATALOGUE_REFRESH']))
+
+    # Counts of session reads and writes per route
+    app.session_stats = session.SessionStats()
+
+    # Encoding of session data stored in Redis, with a histogram of encoded session sizes
+    app.session_codec = session_codec.SessionCodec(app['SESSION_CODEC'], int(app['SESSION_COMPRESS_THRESHOLD']))
+
     # Monkey patch the check_services function as a method to the app object
     app.check_services = types.MethodType(check_services, app)
 
@@ -110,31 +131,50 @@ def create_app(config_name=None) -> Application:
     logger_initial_config(log_level=app['LOG_LEVEL'],
                           ext_log_level=app['EXT_LOG_LEVEL'])
 
-    # Set up routes
+    # Set up routes, with any deadlines other than REQUEST_DEADLINE
+    app.route_deadlines = {}
     routes.setup(app, url_path_prefix=app['URL_PATH_PREFIX'])
 
     # Use content negotiation middleware to render JSON responses
     negotiation.setup(app)
 
+    # Compiles every template at startup, through a bytecode cache shared by the workers
+    app.template_precompiler = templating.TemplatePrecompiler(app['TEMPLATE_CACHE_DIR'])
+
+    # Renders pages and opens connections in the background as the worker starts, /info reports it ready once done
+    app.warm_up = warm_up.WarmUp(float(app['WARM_UP_TIMEOUT']), int(app['WARM_UP_CONNECTIONS']))
+
     # Setup jinja2 environment
     env = aiohttp_jinja2.setup(
         app,
         loader=jinja2.PackageLoader('app', 'templates'),
+        bytecode_cache=app.template_precompiler.bytecode_cache(),
         context_processors=[
             flash.context_processor, aiohttp_jinja2.request_processor,
             google_analytics.ga_ua_id_processor, domains.domain_processor, security.context_processor
         ],
-        extensions=['app.i18n.i18n'])
+        extensions=['app.i18n.i18n', 'app.templating.FragmentCacheExtension'])
 
     env.filters['setAttributes'] = jinja_filter_set_attributes
     env.install_gettext_translations(i18n, newstyle=True)
 
+    # Renders the {% cache %} regions of templates once per worker
+    app.fragment_cache = env.fragment_cache = templating.FragmentCache(int(app['TEMPLATE_FRAGMENT_CACHE_SIZE']))
+
     # JWT KeyStore
     app['key_store'] = jwt.key_store(app['JSON_SECRET_KEYS'])
 
-    app.on_startup.append(on_startup)
-    app.on_cleanup.append(on_cleanup)
+    app.on_startup.append(app.http_clients.on_startup)
+    app.on_startup.append(session.on_startup)
+    app.on_startup.append(app.fulfilment_catalogue.on_startup)
+    app.on_startup.append(app.template_precompiler.on_startup)
+    app.on_startup.append(app.warm_up.on_startup)
+    app.on_cleanup.append(app.warm_up.on_cleanup)
+    app.on_cleanup.append(app.fulfilment_catalogue.on_cleanup)
+    app.on_cleanup.append(session.on_cleanup)
+    app.on_cleanup.append(app.http_clients.on_cleanup)
     app.on_response_prepare.append(security.on_prepare)
+    app.on_response_prepare.append(trace.on_prepare)
 
     logger.info('app setup complete', config=config_name)
 
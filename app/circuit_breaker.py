@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from contextlib import contextmanager
+
+from aiohttp.client_exceptions import ClientConnectionError, ClientResponseError
+from structlog import get_logger
+
+from .exceptions import CircuitOpenError, DeadlineExceeded
+
+logger = get_logger('respondent-home')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# responses meaning the service, rather than the request, is the problem
+UNAVAILABLE_STATUSES = (502, 503, 504)
+
+
+class CircuitBreaker:
+    """
+    Stop making requests to an upstream service once failure_threshold requests in a row have failed to reach it, or
+    been answered with one of UNAVAILABLE_STATUSES, so that during an outage requests fail fast rather than each retrying until it gives up.
+    After reset_timeout seconds a single trial request is let through, closing the circuit again if it succeeds.
+    """
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+
+    def _admit(self):
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            logger.info('circuit breaker half open', service=self.name)
+        if self.state == CLOSED:
+            return
+        if self.state == HALF_OPEN and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(f'circuit breaker open for {self.name}')
+
+    def _succeeded(self):
+        if self.state != CLOSED:
+            logger.info('circuit breaker closed', service=self.name)
+        self.state = CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def _failed(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.opened += 1
+                logger.warn('circuit breaker opened', service=self.name, failures=self.failures)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    @contextmanager
+    def guard(self):
+        """
+        Raise CircuitOpenError rather than run the block when the circuit is open, otherwise record its outcome.
+        """
+        self._admit()
+        try:
+            yield
+        except DeadlineExceeded:
+            # the user's request ran out of time before a request was made
+            self.trial_in_flight = False
+            raise
+        except (ClientConnectionError, asyncio.TimeoutError):
+            self._failed()
+            raise
+        except ClientResponseError as ex:
+            if ex.status in UNAVAILABLE_STATUSES:
+                self._failed()
+            else:
+                self._succeeded()
+            raise
+        except BaseException:
+            # neither outcome, such as the request being cancelled, so let another trial through
+            self.trial_in_flight = False
+            raise
+        else:
+            self._succeeded()
+
+    def stats(self) -> dict:
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'opened': self.opened,
+            'rejected': self.rejected
+        }
@@ -12,8 +12,10 @@ from . import (ADDRESS_SELECT_CHECK_MSG,
 
 from .flash import flash
 from .security import get_permitted_session, forget
-from .utils import View, ProcessPostcode, InvalidDataError, InvalidDataErrorWelsh, FlashMessage, AddressIndex, RHService
+from .utils import View, ProcessPostcode, InvalidDataError, InvalidDataErrorWelsh, FlashMessage, AddressIndex, RHService, \
+    cached_page
 from .session import get_existing_session, get_session_value
+from .templating import stream_template
 
 logger = get_logger('respondent-home')
 common_routes = RouteTableDef()
@@ -61,6 +63,7 @@ class CommonAddressInScotland(CommonCommon):
     """
     Route to render an 'Address in Scotland' page during address lookups
     """
+    @cached_page
     @aiohttp_jinja2.template('common-address-in-scotland.html')
     async def get(self, request):
         display_region = request.match_info['display_region']
@@ -93,6 +96,7 @@ class CommonAddressInNorthernIreland(CommonCommon):
     """
     Route to render an 'Address in Northern Ireland' page during address lookups if display_region is not 'ni'
     """
+    @cached_page
     @aiohttp_jinja2.template('common-address-in-northern-ireland.html')
     async def get(self, request):
         display_region = request.match_info['display_region']
@@ -122,6 +126,7 @@ class CommonAddressInEngland(CommonCommon):
     Route to render an 'Address in England' page during address lookups if display_region is 'ni'
     and selected addresses region is E
     """
+    @cached_page
     @aiohttp_jinja2.template('common-address-in-england.html')
     async def get(self, request):
         display_region = 'ni'
@@ -146,6 +151,7 @@ class CommonAddressInWales(CommonCommon):
     Route to render an 'Address in Wales' page during address lookups if display_region is 'ni'
     and selected addresses region is W
     """
+    @cached_page
     @aiohttp_jinja2.template('common-address-in-wales.html')
     async def get(self, request):
         display_region = 'ni'
@@ -201,6 +207,7 @@ class CommonCallContactCentre(CommonCommon):
     """
     Common route to render a 'Call the Contact Centre' page from any journey
     """
+    @cached_page
     @aiohttp_jinja2.template('common-contact-centre.html')
     async def get(self, request):
         display_region = request.match_info['display_region']
@@ -377,6 +384,9 @@ class CommonSelectAddress(CommonCommon):
         address_content['contact_us_link'] = View.get_campaign_site_link(request, display_region, 'contact-us')
         address_content['call_centre_number'] = View.get_call_centre_number(display_region)
 
+        if len(address_content['addresses']) > int(request.app['SELECT_ADDRESS_STREAM_THRESHOLD']):
+            return await stream_template('common-select-address.html', request, address_content)
+
         return address_content
 
     async def post(self, request):
@@ -41,6 +41,10 @@ class BaseConfig:
     PORT = env('PORT')
     LOG_LEVEL = env('LOG_LEVEL')
     EXT_LOG_LEVEL = env('EXT_LOG_LEVEL')
+    TEMPLATE_CACHE_DIR = env('TEMPLATE_CACHE_DIR', default='')
+    TEMPLATE_FRAGMENT_CACHE_SIZE = env('TEMPLATE_FRAGMENT_CACHE_SIZE', default='256')
+    WARM_UP_TIMEOUT = env('WARM_UP_TIMEOUT', default='30')
+    WARM_UP_CONNECTIONS = env('WARM_UP_CONNECTIONS', default='4')
 
     DOMAIN_URL_PROTOCOL = env('DOMAIN_URL_PROTOCOL', default='https://')
     DOMAIN_URL_EN = env('DOMAIN_URL_EN')
@@ -52,6 +56,11 @@ class BaseConfig:
 
     RHSVC_URL = env('RHSVC_URL')
     RHSVC_AUTH = (env('RHSVC_USERNAME'), env('RHSVC_PASSWORD'))
+    RHSVC_POOL_LIMIT = env('RHSVC_POOL_LIMIT', default='100')
+    RHSVC_KEEPALIVE_TIMEOUT = env('RHSVC_KEEPALIVE_TIMEOUT', default='5')
+    RHSVC_DNS_CACHE_TTL = env('RHSVC_DNS_CACHE_TTL', default='10')
+    RHSVC_CONNECT_TIMEOUT = env('RHSVC_CONNECT_TIMEOUT', default='5')
+    RHSVC_TIMEOUT = env('RHSVC_TIMEOUT', default='30')
 
     URL_PATH_PREFIX = env('URL_PATH_PREFIX', default='')
 
@@ -61,22 +70,56 @@ class BaseConfig:
     REDIS_SERVER = env('REDIS_SERVER', default='localhost')
 
     REDIS_PORT = env('REDIS_PORT', default='7379')
-    REDIS_POOL_MIN = env('REDIS_POOL_MIN', default='50')
+    REDIS_UNIX_SOCKET = env('REDIS_UNIX_SOCKET', default='')
+    REDIS_POOL_MIN = env('REDIS_POOL_MIN', default='1')
     REDIS_POOL_MAX = env('REDIS_POOL_MAX', default='500')
 
     SESSION_AGE = env('SESSION_AGE', default='2700')  # 45 minutes
+    SESSION_DATA_AGE = env('SESSION_DATA_AGE', default='600')  # 10 minutes
+    SESSION_CODEC = env('SESSION_CODEC', default='msgpack')
+    SESSION_COMPRESS_THRESHOLD = env('SESSION_COMPRESS_THRESHOLD', default='1024')
 
     WEBCHAT_SVC_URL = env('WEBCHAT_SVC_URL')
 
     ADDRESS_INDEX_SVC_URL = env('ADDRESS_INDEX_SVC_URL')
     ADDRESS_INDEX_SVC_AUTH = (env('ADDRESS_INDEX_SVC_USERNAME'), env('ADDRESS_INDEX_SVC_PASSWORD'))
+    ADDRESS_INDEX_SVC_POOL_LIMIT = env('ADDRESS_INDEX_SVC_POOL_LIMIT', default='50')
+    ADDRESS_INDEX_SVC_KEEPALIVE_TIMEOUT = env('ADDRESS_INDEX_SVC_KEEPALIVE_TIMEOUT', default='5')
+    ADDRESS_INDEX_SVC_DNS_CACHE_TTL = env('ADDRESS_INDEX_SVC_DNS_CACHE_TTL', default='10')
+    ADDRESS_INDEX_SVC_CONNECT_TIMEOUT = env('ADDRESS_INDEX_SVC_CONNECT_TIMEOUT', default='5')
+    ADDRESS_INDEX_SVC_TIMEOUT = env('ADDRESS_INDEX_SVC_TIMEOUT', default='30')
     ADDRESS_INDEX_EPOCH = env('ADDRESS_INDEX_EPOCH', default='')
+    ADDRESS_INDEX_CACHE_TTL = env('ADDRESS_INDEX_CACHE_TTL', default='300')
+    ADDRESS_INDEX_CACHE_SIZE = env('ADDRESS_INDEX_CACHE_SIZE', default='1000')
+    SELECT_ADDRESS_STREAM_THRESHOLD = env('SELECT_ADDRESS_STREAM_THRESHOLD', default='500')
+    PAGE_CACHE_TTL = env('PAGE_CACHE_TTL', default='3600')
+    PAGE_CACHE_SIZE = env('PAGE_CACHE_SIZE', default='500')
+
+    FULFILMENT_CATALOGUE_REFRESH = env('FULFILMENT_CATALOGUE_REFRESH', default='3600')
 
     AD_LOOK_UP_SVC_URL = env('AD_LOOK_UP_SVC_URL')
     AD_LOOK_UP_SVC_AUTH = (env('AD_LOOK_UP_SVC_USERNAME'), env('AD_LOOK_UP_SVC_PASSWORD'))
     AD_LOOK_UP_SVC_APIKEY = env('AD_LOOK_UP_SVC_APIKEY')
     AD_LOOK_UP_SVC_APPID = env('AD_LOOK_UP_SVC_APPID')
+    AD_LOOK_UP_SVC_POOL_LIMIT = env('AD_LOOK_UP_SVC_POOL_LIMIT', default='20')
+    AD_LOOK_UP_SVC_KEEPALIVE_TIMEOUT = env('AD_LOOK_UP_SVC_KEEPALIVE_TIMEOUT', default='5')
+    AD_LOOK_UP_SVC_DNS_CACHE_TTL = env('AD_LOOK_UP_SVC_DNS_CACHE_TTL', default='10')
+    AD_LOOK_UP_SVC_CONNECT_TIMEOUT = env('AD_LOOK_UP_SVC_CONNECT_TIMEOUT', default='5')
+    AD_LOOK_UP_SVC_TIMEOUT = env('AD_LOOK_UP_SVC_TIMEOUT', default='30')
+    UPSTREAM_FALLBACK_POOL_LIMIT = env('UPSTREAM_FALLBACK_POOL_LIMIT', default='20')
+    UPSTREAM_FALLBACK_KEEPALIVE_TIMEOUT = env('UPSTREAM_FALLBACK_KEEPALIVE_TIMEOUT', default='1')
+    UPSTREAM_FALLBACK_DNS_CACHE_TTL = env('UPSTREAM_FALLBACK_DNS_CACHE_TTL', default='10')
+    UPSTREAM_FALLBACK_CONNECT_TIMEOUT = env('UPSTREAM_FALLBACK_CONNECT_TIMEOUT', default='5')
+    UPSTREAM_FALLBACK_TIMEOUT = env('UPSTREAM_FALLBACK_TIMEOUT', default='30')
+    UPSTREAM_CIRCUIT_FAILURE_THRESHOLD = env('UPSTREAM_CIRCUIT_FAILURE_THRESHOLD', default='5')
+    UPSTREAM_CIRCUIT_RESET_TIMEOUT = env('UPSTREAM_CIRCUIT_RESET_TIMEOUT', default='30')
+    UPSTREAM_RETRY_BUDGET_RATIO = env('UPSTREAM_RETRY_BUDGET_RATIO', default='0.2')
+    UPSTREAM_RETRY_BUDGET_MIN_RETRIES = env('UPSTREAM_RETRY_BUDGET_MIN_RETRIES', default='10')
+    UPSTREAM_RETRY_BUDGET_WINDOW = env('UPSTREAM_RETRY_BUDGET_WINDOW', default='10')
+    UPSTREAM_RETRY_AFTER_MAX = env('UPSTREAM_RETRY_AFTER_MAX', default='1')
+    REQUEST_DEADLINE = env('REQUEST_DEADLINE', default='10')
     EQ_SALT = env('EQ_SALT', default='s3cr3tS4lt')
+    CLIENT_ID_SECRET = env('CLIENT_ID_SECRET')
 
 
 class ProductionConfig(BaseConfig):
@@ -89,6 +132,10 @@ class DevelopmentConfig:
     PORT = env.int('PORT', default='9092')
     LOG_LEVEL = env('LOG_LEVEL', default='INFO')
     EXT_LOG_LEVEL = env('EXT_LOG_LEVEL', default='WARN')
+    TEMPLATE_CACHE_DIR = env('TEMPLATE_CACHE_DIR', default='')
+    TEMPLATE_FRAGMENT_CACHE_SIZE = env('TEMPLATE_FRAGMENT_CACHE_SIZE', default='256')
+    WARM_UP_TIMEOUT = env('WARM_UP_TIMEOUT', default='30')
+    WARM_UP_CONNECTIONS = env('WARM_UP_CONNECTIONS', default='4')
 
     DOMAIN_URL_PROTOCOL = 'http://'
     DOMAIN_URL_EN = env.str('DOMAIN_URL_EN', default='localhost:9092')
@@ -104,6 +151,11 @@ class DevelopmentConfig:
     RHSVC_URL = env.str('RHSVC_URL', default='http://localhost:8071')
     RHSVC_AUTH = (env.str('RHSVC_USERNAME', default='admin'),
                   env.str('RHSVC_PASSWORD', default='secret'))
+    RHSVC_POOL_LIMIT = env('RHSVC_POOL_LIMIT', default='100')
+    RHSVC_KEEPALIVE_TIMEOUT = env('RHSVC_KEEPALIVE_TIMEOUT', default='5')
+    RHSVC_DNS_CACHE_TTL = env('RHSVC_DNS_CACHE_TTL', default='10')
+    RHSVC_CONNECT_TIMEOUT = env('RHSVC_CONNECT_TIMEOUT', default='5')
+    RHSVC_TIMEOUT = env('RHSVC_TIMEOUT', default='30')
 
     URL_PATH_PREFIX = env('URL_PATH_PREFIX', default='')
 
@@ -113,10 +165,14 @@ class DevelopmentConfig:
     REDIS_SERVER = env('REDIS_SERVER', default='localhost')
 
     REDIS_PORT = env('REDIS_PORT', default='7379')
-    REDIS_POOL_MIN = env('REDIS_POOL_MIN', default='50')
+    REDIS_UNIX_SOCKET = env('REDIS_UNIX_SOCKET', default='')
+    REDIS_POOL_MIN = env('REDIS_POOL_MIN', default='1')
     REDIS_POOL_MAX = env('REDIS_POOL_MAX', default='500')
 
     SESSION_AGE = env('SESSION_AGE', default='2700')  # 45 minutes
+    SESSION_DATA_AGE = env('SESSION_DATA_AGE', default='600')  # 10 minutes
+    SESSION_CODEC = env('SESSION_CODEC', default='msgpack')
+    SESSION_COMPRESS_THRESHOLD = env('SESSION_COMPRESS_THRESHOLD', default='1024')
 
     WEBCHAT_SVC_URL = env.str(
         'WEBCHAT_SVC_URL',
@@ -126,14 +182,44 @@ class DevelopmentConfig:
     ADDRESS_INDEX_SVC_URL = env.str('ADDRESS_INDEX_SVC_URL', default='http://localhost:9000')
     ADDRESS_INDEX_SVC_AUTH = (env.str('ADDRESS_INDEX_SVC_USERNAME', default='admin'),
                               env.str('ADDRESS_INDEX_SVC_PASSWORD', default='secret'))
+    ADDRESS_INDEX_SVC_POOL_LIMIT = env('ADDRESS_INDEX_SVC_POOL_LIMIT', default='50')
+    ADDRESS_INDEX_SVC_KEEPALIVE_TIMEOUT = env('ADDRESS_INDEX_SVC_KEEPALIVE_TIMEOUT', default='5')
+    ADDRESS_INDEX_SVC_DNS_CACHE_TTL = env('ADDRESS_INDEX_SVC_DNS_CACHE_TTL', default='10')
+    ADDRESS_INDEX_SVC_CONNECT_TIMEOUT = env('ADDRESS_INDEX_SVC_CONNECT_TIMEOUT', default='5')
+    ADDRESS_INDEX_SVC_TIMEOUT = env('ADDRESS_INDEX_SVC_TIMEOUT', default='30')
     ADDRESS_INDEX_EPOCH = env.str('ADDRESS_INDEX_EPOCH', default='')
+    ADDRESS_INDEX_CACHE_TTL = env('ADDRESS_INDEX_CACHE_TTL', default='300')
+    ADDRESS_INDEX_CACHE_SIZE = env('ADDRESS_INDEX_CACHE_SIZE', default='1000')
+    SELECT_ADDRESS_STREAM_THRESHOLD = env('SELECT_ADDRESS_STREAM_THRESHOLD', default='500')
+    PAGE_CACHE_TTL = env('PAGE_CACHE_TTL', default='3600')
+    PAGE_CACHE_SIZE = env('PAGE_CACHE_SIZE', default='500')
+
+    FULFILMENT_CATALOGUE_REFRESH = env('FULFILMENT_CATALOGUE_REFRESH', default='3600')
 
     AD_LOOK_UP_SVC_URL = env.str('AD_LOOK_UP_SVC_URL', default='http://localhost:8071/v1')
     AD_LOOK_UP_SVC_AUTH = (env.str('AD_LOOK_UP_SVC_USERNAME', default='admin'),
                            env.str('AD_LOOK_UP_SVC_PASSWORD', default='secret'))
     AD_LOOK_UP_SVC_APIKEY = env.str('AD_LOOK_UP_SVC_APIKEY', default='apikey')
     AD_LOOK_UP_SVC_APPID = env.str('AD_LOOK_UP_SVC_APPID', default='appid')
+    AD_LOOK_UP_SVC_POOL_LIMIT = env('AD_LOOK_UP_SVC_POOL_LIMIT', default='20')
+    AD_LOOK_UP_SVC_KEEPALIVE_TIMEOUT = env('AD_LOOK_UP_SVC_KEEPALIVE_TIMEOUT', default='5')
+    AD_LOOK_UP_SVC_DNS_CACHE_TTL = env('AD_LOOK_UP_SVC_DNS_CACHE_TTL', default='10')
+    AD_LOOK_UP_SVC_CONNECT_TIMEOUT = env('AD_LOOK_UP_SVC_CONNECT_TIMEOUT', default='5')
+    AD_LOOK_UP_SVC_TIMEOUT = env('AD_LOOK_UP_SVC_TIMEOUT', default='30')
+    UPSTREAM_FALLBACK_POOL_LIMIT = env('UPSTREAM_FALLBACK_POOL_LIMIT', default='20')
+    UPSTREAM_FALLBACK_KEEPALIVE_TIMEOUT = env('UPSTREAM_FALLBACK_KEEPALIVE_TIMEOUT', default='1')
+    UPSTREAM_FALLBACK_DNS_CACHE_TTL = env('UPSTREAM_FALLBACK_DNS_CACHE_TTL', default='10')
+    UPSTREAM_FALLBACK_CONNECT_TIMEOUT = env('UPSTREAM_FALLBACK_CONNECT_TIMEOUT', default='5')
+    UPSTREAM_FALLBACK_TIMEOUT = env('UPSTREAM_FALLBACK_TIMEOUT', default='30')
+    UPSTREAM_CIRCUIT_FAILURE_THRESHOLD = env('UPSTREAM_CIRCUIT_FAILURE_THRESHOLD', default='5')
+    UPSTREAM_CIRCUIT_RESET_TIMEOUT = env('UPSTREAM_CIRCUIT_RESET_TIMEOUT', default='30')
+    UPSTREAM_RETRY_BUDGET_RATIO = env('UPSTREAM_RETRY_BUDGET_RATIO', default='0.2')
+    UPSTREAM_RETRY_BUDGET_MIN_RETRIES = env('UPSTREAM_RETRY_BUDGET_MIN_RETRIES', default='10')
+    UPSTREAM_RETRY_BUDGET_WINDOW = env('UPSTREAM_RETRY_BUDGET_WINDOW', default='10')
+    UPSTREAM_RETRY_AFTER_MAX = env('UPSTREAM_RETRY_AFTER_MAX', default='1')
+    REQUEST_DEADLINE = env('REQUEST_DEADLINE', default='10')
     EQ_SALT = env('EQ_SALT', default='s3cr3tS4lt')
+    CLIENT_ID_SECRET = env('CLIENT_ID_SECRET', default='cl13ntS3cr3t')
 
 
 class TestingConfig:
@@ -141,6 +227,10 @@ class TestingConfig:
     PORT = '9092'
     LOG_LEVEL = 'DEBUG'
     EXT_LOG_LEVEL = 'DEBUG'
+    TEMPLATE_CACHE_DIR = ''
+    TEMPLATE_FRAGMENT_CACHE_SIZE = '256'
+    WARM_UP_TIMEOUT = '0'
+    WARM_UP_CONNECTIONS = '4'
 
     DOMAIN_URL_PROTOCOL = 'http://'
     DOMAIN_URL_EN = 'localhost:9092'
@@ -152,6 +242,11 @@ class TestingConfig:
 
     RHSVC_URL = 'http://localhost:8071'
     RHSVC_AUTH = ('admin', 'secret')
+    RHSVC_POOL_LIMIT = '100'
+    RHSVC_KEEPALIVE_TIMEOUT = '5'
+    RHSVC_DNS_CACHE_TTL = '10'
+    RHSVC_CONNECT_TIMEOUT = '5'
+    RHSVC_TIMEOUT = '30'
 
     URL_PATH_PREFIX = ''
 
@@ -161,19 +256,53 @@ class TestingConfig:
     REDIS_SERVER = ''
 
     REDIS_PORT = ''
-    REDIS_POOL_MIN = '50'
+    REDIS_UNIX_SOCKET = ''
+    REDIS_POOL_MIN = '1'
     REDIS_POOL_MAX = '500'
 
     SESSION_AGE = ''
+    SESSION_DATA_AGE = '600'
+    SESSION_CODEC = 'msgpack'
+    SESSION_COMPRESS_THRESHOLD = '1024'
 
     WEBCHAT_SVC_URL = 'https://www.timeforstorm.com/IM/endpoint/client/5441/ONSWebchat/ce033298af0c07067a77b7940c011ec8ef670d66b7fe15c5776a16e205478221'
 
     ADDRESS_INDEX_SVC_URL = 'http://localhost:9000'
     ADDRESS_INDEX_SVC_AUTH = ('admin', 'secret')
+    ADDRESS_INDEX_SVC_POOL_LIMIT = '50'
+    ADDRESS_INDEX_SVC_KEEPALIVE_TIMEOUT = '5'
+    ADDRESS_INDEX_SVC_DNS_CACHE_TTL = '10'
+    ADDRESS_INDEX_SVC_CONNECT_TIMEOUT = '5'
+    ADDRESS_INDEX_SVC_TIMEOUT = '30'
     ADDRESS_INDEX_EPOCH = ''
+    ADDRESS_INDEX_CACHE_TTL = '300'
+    ADDRESS_INDEX_CACHE_SIZE = '1000'
+    SELECT_ADDRESS_STREAM_THRESHOLD = '500'
+    PAGE_CACHE_TTL = '3600'
+    PAGE_CACHE_SIZE = '500'
+
+    FULFILMENT_CATALOGUE_REFRESH = '0'
 
     AD_LOOK_UP_SVC_URL = 'http://localhost:8071/v1'
     AD_LOOK_UP_SVC_AUTH = ('admin', 'secret')
     AD_LOOK_UP_SVC_APIKEY = 'apikey'
     AD_LOOK_UP_SVC_APPID = 'appid'
+    AD_LOOK_UP_SVC_POOL_LIMIT = '20'
+    AD_LOOK_UP_SVC_KEEPALIVE_TIMEOUT = '5'
+    AD_LOOK_UP_SVC_DNS_CACHE_TTL = '10'
+    AD_LOOK_UP_SVC_CONNECT_TIMEOUT = '5'
+    AD_LOOK_UP_SVC_TIMEOUT = '30'
+    UPSTREAM_FALLBACK_POOL_LIMIT = '20'
+    UPSTREAM_FALLBACK_KEEPALIVE_TIMEOUT = '1'
+    UPSTREAM_FALLBACK_DNS_CACHE_TTL = '10'
+    UPSTREAM_FALLBACK_CONNECT_TIMEOUT = '5'
+    UPSTREAM_FALLBACK_TIMEOUT = '30'
+    UPSTREAM_CIRCUIT_FAILURE_THRESHOLD = '5'
+    UPSTREAM_CIRCUIT_RESET_TIMEOUT = '30'
+    UPSTREAM_RETRY_BUDGET_RATIO = '0.2'
+    UPSTREAM_RETRY_BUDGET_MIN_RETRIES = '10'
+    UPSTREAM_RETRY_BUDGET_WINDOW = '10'
+    UPSTREAM_RETRY_AFTER_MAX = '1'
+    REQUEST_DEADLINE = '10'
     EQ_SALT = 's3cr3tS4lt'
+    CLIENT_ID_SECRET = 'cl13ntS3cr3t'
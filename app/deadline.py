@@ -0,0 +1,23 @@
+import time
+
+from aiohttp import web
+
+
+@web.middleware
+async def deadline_middleware(request, handler):
+    """
+    Give the request a deadline, by which upstream calls made for it must be done, of REQUEST_DEADLINE seconds or
+    the deadline its route was given, so that they are not still retrying after the browser has given up.
+    """
+    view = getattr(request.match_info.handler, '__self__', None)
+    seconds = request.app.route_deadlines.get(type(view)) or float(request.app['REQUEST_DEADLINE'])
+    request['deadline'] = time.monotonic() + seconds
+    return await handler(request)
+
+
+def remaining(request):
+    """
+    Seconds left before the request's deadline, or None if it has none.
+    """
+    deadline = request.get('deadline')
+    return None if deadline is None else deadline - time.monotonic()
@@ -1,3 +1,6 @@
+from aiohttp.client_exceptions import ClientConnectionError
+
+
 class InactiveCaseError(Exception):
     """Raised when a user enters a used IAC code"""
     def __init__(self, case_type):
@@ -61,3 +64,11 @@ class InvalidDataErrorWelsh(Exception):
 
 class InvalidAccessCode(Exception):
     """Raised when an invalid UAC is entered"""
+
+
+class CircuitOpenError(ClientConnectionError):
+    """Raised instead of making a request to an upstream service whose circuit breaker is open"""
+
+
+class DeadlineExceeded(ClientConnectionError):
+    """Raised instead of making or retrying a request to an upstream service once the user's request has run out of time"""
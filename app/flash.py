@@ -4,6 +4,8 @@ from functools import partial
 from aiohttp import web
 from aiohttp_session import get_session
 
+from .session import has_session_cookie
+
 SESSION_KEY = REQUEST_KEY = 'flash'
 
 
@@ -17,10 +19,26 @@ def pop_flash(request):
     return flash
 
 
+async def pop_flash_before_prepare(request):
+    """
+    Pop the flashed messages for a response streamed from its handler, removing them from the session as
+    flash_middleware would, as the session has to be saved before such a response is prepared.
+    """
+    flash = pop_flash(request)
+    if flash and has_session_cookie(request):
+        session = await get_session(request)
+        session.pop(SESSION_KEY, None)
+    return flash
+
+
 @web.middleware
 async def flash_middleware(request, handler):
-    session = await get_session(request)
-    flash_incoming = session.get(SESSION_KEY, [])
+    # only load the session when there is one, flashed messages are added to a new session if needed
+    if has_session_cookie(request):
+        session = await get_session(request)
+        flash_incoming = session.get(SESSION_KEY, [])
+    else:
+        flash_incoming = []
     request[REQUEST_KEY] = deepcopy(
         flash_incoming)  # copy flash for modification
     try:
@@ -28,10 +46,11 @@ async def flash_middleware(request, handler):
     finally:
         flash_outgoing = request[REQUEST_KEY]
         if flash_outgoing != flash_incoming:
+            session = await get_session(request)
             if flash_outgoing:
                 session[SESSION_KEY] = flash_outgoing
             else:
-                del session[SESSION_KEY]
+                session.pop(SESSION_KEY, None)
     return response
 
 
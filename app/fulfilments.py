@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from aiohttp.client_exceptions import ClientError
+from structlog import get_logger
+
+logger = get_logger('respondent-home')
+
+# how long to wait before retrying a failed catalogue load, if sooner than the refresh interval
+RETRY_INTERVAL = 30
+
+
+class FulfilmentCatalogue:
+    """
+    In memory copy of the RHSvc fulfilment product catalogue, loaded at startup and refreshed in the background.
+    Products are filtered locally, in the same way RHSvc filters them for a GET /fulfilments query.
+    A refresh interval of 0 disables the catalogue, so every lookup misses and callers fall back to RHSvc.
+    """
+    def __init__(self, refresh_interval):
+        self.refresh_interval = refresh_interval
+        self.products = None
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self._refresh_task = None
+
+    @property
+    def enabled(self):
+        return self.refresh_interval > 0
+
+    def find(self, case_type, region, delivery_channel, product_group, individual):
+        """
+        Return the products matching a get_fulfilment query, or None if the catalogue has none to offer.
+        The products returned are shared with the catalogue, so must be treated as read only.
+        """
+        if self.products is None:
+            self.misses += 1
+            return None
+        individual = str(individual).lower()
+        matches = [
+            product for product in self.products
+            if case_type in product['caseTypes'] and region in product['regions']
+            and product['deliveryChannel'] == delivery_channel and product['productGroup'] == product_group
+            and str(product['individual']).lower() == individual
+        ]
+        if not matches:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return matches
+
+    async def refresh(self, app) -> bool:
+        url = f"{app['RHSVC_URL']}/fulfilments"
+        try:
+            async with app.http_clients.session_for(url).get(url) as resp:
+                resp.raise_for_status()
+                products = await resp.json()
+        except (ClientError, asyncio.TimeoutError, ValueError) as ex:
+            self.refresh_failures += 1
+            logger.warn('failed to load fulfilment catalogue', url=url, error=repr(ex))
+            return False
+        self.products = products
+        self.loaded_at = time.time()
+        self.refreshes += 1
+        logger.info('fulfilment catalogue loaded', products=len(products))
+        return True
+
+    async def _refresh_loop(self, app):
+        while True:
+            loaded = await self.refresh(app)
+            await asyncio.sleep(self.refresh_interval if loaded else min(self.refresh_interval, RETRY_INTERVAL))
+
+    async def on_startup(self, app):
+        if self.enabled:
+            self._refresh_task = asyncio.ensure_future(self._refresh_loop(app))
+
+    async def on_cleanup(self, app):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'products': len(self.products) if self.products is not None else None,
+            'age': round(time.time() - self.loaded_at) if self.loaded_at else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures
+        }
@@ -5,6 +5,7 @@ from structlog import get_logger
 
 from . import VERSION
 from .security import forget
+from .session import redis_pool_stats
 from .utils import View
 
 logger = get_logger('respondent-home')
@@ -17,9 +18,25 @@ class Info(View):
         info = {
             'name': 'respondent-home-ui',
             'version': VERSION,
+            'warmed_up': request.app.warm_up.done,
         }
         if 'check' in request.query:
-            info['ready'] = await request.app.check_services()
+            info['ready'] = request.app.warm_up.done and await request.app.check_services()
+            info['circuits'] = request.app.http_clients.circuits()
+        if 'stats' in request.query:
+            info['stats'] = {
+                'address_index_postcode_cache': request.app.postcode_cache.stats(),
+                'page_cache': request.app.page_cache.stats(),
+                'upstream_coalescing': request.app.singleflight.stats(),
+                'upstream_pools': request.app.http_clients.stats(),
+                'fulfilment_catalogue': request.app.fulfilment_catalogue.stats(),
+                'redis_pool': redis_pool_stats(request.app),
+                'session': request.app.session_stats.stats(),
+                'session_codec': request.app.session_codec.stats(),
+                'templates': request.app.template_precompiler.stats(),
+                'template_fragments': request.app.fragment_cache.stats(),
+                'warm_up': request.app.warm_up.stats()
+            }
         return json_response(info)
 
 
@@ -0,0 +1,201 @@
+import time
+
+from contextlib import contextmanager
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+
+from .circuit_breaker import CircuitBreaker
+from .retry_budget import RetryBudget
+
+# upstream service name: prefix of its configuration keys
+UPSTREAMS = {
+    'rhsvc': 'RHSVC',
+    'address_index': 'ADDRESS_INDEX_SVC',
+    'ad_lookup': 'AD_LOOK_UP_SVC',
+}
+
+# prefix of the configuration keys of the pool requests fall back to
+FALLBACK = 'UPSTREAM_FALLBACK'
+
+
+def pool_config(app, prefix) -> dict:
+    return {
+        'limit': int(app[f'{prefix}_POOL_LIMIT']),
+        'keepalive_timeout': float(app[f'{prefix}_KEEPALIVE_TIMEOUT']),
+        'ttl_dns_cache': int(app[f'{prefix}_DNS_CACHE_TTL']),
+        'connect_timeout': float(app[f'{prefix}_CONNECT_TIMEOUT']),
+        'timeout': float(app[f'{prefix}_TIMEOUT'])
+    }
+
+
+class UpstreamClient:
+    """
+    A ClientSession for one upstream service, with its own connection limit, keep-alive, DNS cache and timeouts,
+    so that a slow service can only use up its own connections, a CircuitBreaker, so that an unavailable one fails
+    fast, and a RetryBudget, so that an overloaded one is not swamped with retries.
+    Counts requests and connections made, and how often and for how long requests waited for a free connection.
+    """
+    def __init__(self, name, base_url, limit, keepalive_timeout, ttl_dns_cache, connect_timeout, timeout,
+                 breaker=None, retry_budget=None):
+        self.name = name
+        self.base_url = base_url
+        self.breaker = breaker or CircuitBreaker(name)
+        self.retry_budget = retry_budget or RetryBudget(name)
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = ClientTimeout(total=timeout, connect=connect_timeout)
+        self.session = None
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    @classmethod
+    def from_config(cls, app, name, prefix):
+        breaker = CircuitBreaker(name, failure_threshold=int(app['UPSTREAM_CIRCUIT_FAILURE_THRESHOLD']),
+                                 reset_timeout=float(app['UPSTREAM_CIRCUIT_RESET_TIMEOUT']))
+        retry_budget = RetryBudget(name, ratio=float(app['UPSTREAM_RETRY_BUDGET_RATIO']),
+                                   min_retries=int(app['UPSTREAM_RETRY_BUDGET_MIN_RETRIES']),
+                                   window=int(app['UPSTREAM_RETRY_BUDGET_WINDOW']))
+        return cls(name, app[f'{prefix}_URL'], breaker=breaker, retry_budget=retry_budget, **pool_config(app, prefix))
+
+    def _trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_connection_queued_end)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        return trace_config
+
+    async def _on_request_start(self, session, context, params):
+        self.requests += 1
+
+    async def _on_connection_queued_start(self, session, context, params):
+        self.queued += 1
+        context.queued_at = time.monotonic()
+
+    async def _on_connection_queued_end(self, session, context, params):
+        wait = time.monotonic() - context.queued_at
+        self.queue_wait_total += wait
+        self.queue_wait_max = max(self.queue_wait_max, wait)
+
+    async def _on_connection_create_end(self, session, context, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, context, params):
+        self.connections_reused += 1
+
+    def open(self):
+        connector = TCPConnector(limit=self.limit, keepalive_timeout=self.keepalive_timeout,
+                                 ttl_dns_cache=self.ttl_dns_cache)
+        self.session = ClientSession(connector=connector, timeout=self.timeout, trust_env=True,
+                                     trace_configs=[self._trace_config()])
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def stats(self) -> dict:
+        connector = self.session.connector if self.session is not None else None
+        return {
+            'limit': self.limit,
+            'in_use': len(connector._acquired) if connector else 0,
+            'idle': sum(len(connections) for connections in connector._conns.values()) if connector else 0,
+            'requests': self.requests,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'queued': self.queued,
+            'queue_wait_ms': {
+                'mean': round(self.queue_wait_total / self.queued * 1000, 1) if self.queued else 0,
+                'max': round(self.queue_wait_max * 1000, 1)
+            },
+            'circuit': self.breaker.stats(),
+            'retry_budget': self.retry_budget.stats()
+        }
+
+
+class FallbackClient(UpstreamClient):
+    """
+    A ClientSession shared by requests to any upstream service once they have failed on that service's own pool.
+    Its connections are only kept alive briefly, so that they are not held open to an instance that is shutting down,
+    while a burst of fallbacks still reuses connections rather than opening one for every attempt.
+    Also counts the requests that fall back, those that then fail, and how long falling back takes.
+    """
+    def __init__(self, limit, keepalive_timeout, ttl_dns_cache, connect_timeout, timeout):
+        super().__init__('fallback', None, limit, keepalive_timeout, ttl_dns_cache, connect_timeout, timeout)
+        self.fallbacks = 0
+        self.failures = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    @contextmanager
+    def timed(self):
+        self.fallbacks += 1
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            latency = time.monotonic() - started
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            'fallbacks': self.fallbacks,
+            'failures': self.failures,
+            'latency_ms': {
+                'mean': round(self.latency_total / self.fallbacks * 1000, 1) if self.fallbacks else 0,
+                'max': round(self.latency_max * 1000, 1)
+            }
+        }
+
+
+class UpstreamClients:
+    """
+    An UpstreamClient for each upstream service, chosen by the URL being requested, and the FallbackClient shared by
+    them all.
+    """
+    def __init__(self, clients, fallback):
+        # longest base URL first, as AD Lookup can be served from under the RHSvc URL
+        self.clients = sorted(clients, key=lambda client: len(client.base_url), reverse=True)
+        self.fallback = fallback
+
+    @classmethod
+    def from_config(cls, app):
+        return cls([UpstreamClient.from_config(app, name, prefix) for name, prefix in UPSTREAMS.items()],
+                   FallbackClient(**pool_config(app, FALLBACK)))
+
+    def client_for(self, url) -> UpstreamClient:
+        for client in self.clients:
+            if url.startswith(client.base_url):
+                return client
+        raise ValueError(f'no upstream service configured for {url}')
+
+    def session_for(self, url) -> ClientSession:
+        return self.client_for(url).session
+
+    async def on_startup(self, app):
+        for client in self.clients + [self.fallback]:
+            client.open()
+
+    async def on_cleanup(self, app):
+        for client in self.clients + [self.fallback]:
+            await client.close()
+
+    def circuits(self) -> dict:
+        return {client.name: client.breaker.state for client in sorted(self.clients, key=lambda client: client.name)}
+
+    def stats(self) -> dict:
+        return {
+            **{client.name: client.stats() for client in sorted(self.clients, key=lambda client: client.name)},
+            self.fallback.name: self.fallback.stats()
+        }
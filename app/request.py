@@ -1,16 +1,25 @@
-import aiohttp
+import asyncio
+
+from copy import deepcopy
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from aiohttp import ClientTimeout
 from aiohttp.client_exceptions import (ClientConnectionError,
                                        ClientConnectorError,
                                        ClientResponseError)
 
 from tenacity import (retry,
                       stop_after_attempt,
-                      retry_if_exception_message,
-                      retry_if_exception_type,
-                      wait_exponential,
+                      wait_random_exponential,
                       RetryError)
+from tenacity.retry import retry_base
+from tenacity.stop import stop_base
+from tenacity.wait import wait_base
 from structlog import get_logger
 
+from . import deadline
+from .exceptions import CircuitOpenError, DeadlineExceeded
+
 logger = get_logger('respondent-home')
 
 pooled_attempts_limit = 2
@@ -30,6 +39,115 @@ def after_failed_pooled(retry_state):
     after_failed_attempt('pooled', retry_state)
 
 
+def spend_retry_budget(retry_state):
+    if not retry_state.args[0].spend_retry():
+        retry_state.outcome.result()  # re-raise the failure rather than retry
+
+
+def retry_after(ex):
+    """
+    Seconds the Retry-After header of an error response asks to wait before retrying, or None if it has none.
+    """
+    value = ex.headers.get('Retry-After') if isinstance(ex, ClientResponseError) and ex.headers else None
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class retry_if_transient(retry_base):
+    """
+    Retry failures to connect and 503 responses, and 429 responses that say when to retry.
+    Responses asking to wait for longer than the RetryRequest's retry_after_max, or its time remaining, are not retried.
+    """
+    def __call__(self, retry_state):
+        ex = retry_state.outcome.exception()
+        if isinstance(ex, DeadlineExceeded):
+            return False
+        if isinstance(ex, (ClientConnectionError, ClientConnectorError)):
+            return True
+        if not isinstance(ex, ClientResponseError) or ex.status not in (429, 503):
+            return False
+        wait = retry_after(ex)
+        if wait is None:
+            return ex.status == 503
+        retry_request = retry_state.args[0]
+        remaining = retry_request.remaining()
+        return wait <= retry_request.retry_after_max and (remaining is None or wait < remaining)
+
+
+class stop_at_deadline(stop_base):
+    """
+    Stop retrying once the RetryRequest has no time remaining.
+    """
+    def __call__(self, retry_state):
+        return retry_state.args[0].deadline_passed()
+
+
+class wait_retry_after(wait_base):
+    """
+    Wait as long as the Retry-After header of an error response asks, otherwise as long as wait does.
+    """
+    def __init__(self, wait):
+        self.wait = wait
+
+    def __call__(self, retry_state):
+        wait = retry_after(retry_state.outcome.exception())
+        return self.wait(retry_state) if wait is None else wait
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent requests, so that only one is in flight at a time and every caller shares its outcome.
+    The first caller receives the result itself and later callers receive a copy, so none can alter another's result.
+    """
+    def __init__(self):
+        self._in_flight = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __contains__(self, key):
+        return key in self._in_flight
+
+    def _forget(self, key, future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            future.exception()  # mark as retrieved, waiting callers will each receive it
+
+    async def do(self, key, make_request):
+        """
+        Await make_request() unless an identical request is already in flight, in which case await that instead.
+        The shared request runs in its own task, so a caller being cancelled does not cancel it for the others.
+        """
+        try:
+            future = self._in_flight[key]
+        except KeyError:
+            self.leaders += 1
+            future = asyncio.ensure_future(make_request())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            return await asyncio.shield(future)
+        self.coalesced += 1
+        return deepcopy(await asyncio.shield(future))
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': len(self._in_flight),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced
+        }
+
+
 class RetryRequest:
     """
     Make requests to a URL, but retry under certain conditions to tolerate server graceful shutdown.
@@ -38,6 +156,8 @@ class RetryRequest:
         self.request = request
         self.method = method
         self.url = url
+        self.upstream = request.app.http_clients.client_for(url)
+        self.retry_after_max = float(request.app['UPSTREAM_RETRY_AFTER_MAX'])
         self.auth = auth
         self.headers = request_headers
         self.json = request_json
@@ -55,46 +175,71 @@ class RetryRequest:
                          trace=self.request['trace'],
                          url=self.url)
 
-    @retry(reraise=True, stop=stop_after_attempt(basic_attempt_limit),
-           wait=wait_exponential(multiplier=wait_multiplier, exp_base=25),
+    @retry(reraise=True, stop=stop_after_attempt(basic_attempt_limit) | stop_at_deadline(),
+           wait=wait_retry_after(wait_random_exponential(multiplier=wait_multiplier, exp_base=25)),
            after=after_failed_basic,
-           retry=(retry_if_exception_message(match='503.*') | retry_if_exception_type((ClientConnectionError,
-                                                                                       ClientConnectorError))))
+           before_sleep=spend_retry_budget,
+           retry=retry_if_transient())
     async def _request_basic(self):
-        # basic request without keep-alive to avoid terminating service.
+        # request on the fallback pool, whose short keep-alive avoids holding on to a terminating service.
         logger.info('request using basic connection',
                     client_ip=self.request['client_ip'],
                     client_id=self.request['client_id'],
                     trace=self.request['trace'])
 
-        async with aiohttp.request(
-                self.method, self.url, auth=self.auth, json=self.json, headers=self.headers) as resp:
+        fallback = self.request.app.http_clients.fallback
+        async with fallback.session.request(self.method, self.url, auth=self.auth, json=self.json,
+                                            headers=self.headers, timeout=self.timeout(fallback)) as resp:
             self.__handle_response(resp)
             if self.return_json:
                 return await resp.json()
             else:
                 return None
 
-    @retry(stop=stop_after_attempt(pooled_attempts_limit),
-           wait=wait_exponential(multiplier=wait_multiplier),
+    @retry(stop=stop_after_attempt(pooled_attempts_limit) | stop_at_deadline(),
+           wait=wait_retry_after(wait_random_exponential(multiplier=wait_multiplier)),
            after=after_failed_pooled,
-           retry=(retry_if_exception_message(match='503.*') | retry_if_exception_type((ClientConnectionError,
-                                                                                       ClientConnectorError))))
+           before_sleep=spend_retry_budget,
+           retry=retry_if_transient())
     async def _request_using_pool(self):
-        async with self.request.app.http_session_pool.request(
-                self.method, self.url, auth=self.auth, json=self.json, headers=self.headers, ssl=False) as resp:
+        async with self.upstream.session.request(
+                self.method, self.url, auth=self.auth, json=self.json, headers=self.headers, ssl=False,
+                timeout=self.timeout(self.upstream)) as resp:
             self.__handle_response(resp)
             if self.return_json:
                 return await resp.json()
             else:
                 return None
 
+    async def _request_with_fallback(self):
+        try:
+            return await self._request_using_pool()
+        except RetryError as retry_ex:
+            attempts = retry_ex.last_attempt.attempt_number
+            logger.warn('Could not make request using normal pooled connection',
+                        client_ip=self.request['client_ip'],
+                        client_id=self.request['client_id'],
+                        trace=self.request['trace'],
+                        attempts=attempts)
+            if self.deadline_passed() or not self.spend_retry():
+                retry_ex.reraise()
+            wait = retry_after(retry_ex.last_attempt.exception())
+            if wait:
+                await asyncio.sleep(wait)
+            with self.request.app.http_clients.fallback.timed():
+                return await self._request_basic()
+
     async def make_request(self):
         """
         Make a request with retries.
         First the fast pooled connection will be tried, but if certain failures are detected, then it will be retried.
         If the retry limit is reached then a basic connection will be tried (and retried if necessary)
         Finally the error will be propagated.
+        No request is made while the service's circuit breaker is open, CircuitOpenError is raised instead.
+        Every retry, including falling back to a basic connection, is taken from the service's retry budget, and the
+        last failure is propagated once that is exhausted.
+        Requests are timed out at the user's request's deadline and none are retried after it, DeadlineExceeded is
+        raised if it passes before or during a request.
         """
         logger.debug('making request with handler',
                      client_ip=self.request['client_ip'],
@@ -103,16 +248,15 @@ class RetryRequest:
                      method=self.method,
                      url=self.url)
         try:
-            try:
-                return await self._request_using_pool()
-            except RetryError as retry_ex:
-                attempts = retry_ex.last_attempt.attempt_number
-                logger.warn('Could not make request using normal pooled connection',
-                            client_ip=self.request['client_ip'],
-                            client_id=self.request['client_id'],
-                            trace=self.request['trace'],
-                            attempts=attempts)
-                return await self._request_basic()
+            with self.upstream.breaker.guard():
+                self.upstream.retry_budget.record_request()
+                try:
+                    return await self._request_with_fallback()
+                except asyncio.TimeoutError as ex:
+                    # timed out at the deadline rather than the client's timeout, so not counted against the service
+                    if not self.deadline_passed():
+                        raise ex
+                    raise DeadlineExceeded(f'deadline exceeded waiting for {self.url}') from ex
         except ClientResponseError as ex:
             if ex.status not in [400, 404, 429]:
                 logger.error('error in response',
@@ -131,6 +275,14 @@ class RetryRequest:
                             url=self.url,
                             status_code=ex.status)
             raise ex
+        except (CircuitOpenError, DeadlineExceeded) as ex:
+            logger.warn('request abandoned',
+                        client_ip=self.request['client_ip'],
+                        client_id=self.request['client_id'],
+                        trace=self.request['trace'],
+                        url=self.url,
+                        reason=str(ex))
+            raise ex
         except (ClientConnectionError, ClientConnectorError) as ex:
             logger.error('client failed to connect',
                          client_ip=self.request['client_ip'],
@@ -139,6 +291,35 @@ class RetryRequest:
                          url=self.url)
             raise ex
 
+    def remaining(self):
+        return deadline.remaining(self.request)
+
+    def deadline_passed(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, client) -> ClientTimeout:
+        """
+        The client's timeout, cut short to the time remaining before the deadline.
+        Raises DeadlineExceeded if there is none left.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return client.timeout
+        if remaining <= 0:
+            raise DeadlineExceeded(f'deadline exceeded before request to {self.url}')
+        return ClientTimeout(total=min(remaining, client.timeout.total or remaining), connect=client.timeout.connect)
+
+    def spend_retry(self) -> bool:
+        if self.upstream.retry_budget.spend():
+            return True
+        logger.warn('retry budget exhausted',
+                    client_ip=self.request['client_ip'],
+                    client_id=self.request['client_id'],
+                    trace=self.request['trace'],
+                    url=self.url)
+        return False
+
     def log_too_many_requests(self, ex: ClientResponseError):
         ai_svc_url = self.request.app['ADDRESS_INDEX_SVC_URL']
         tracking = {"client_ip": self.request['client_ip'], "client_id": self.request['client_id'],
@@ -14,7 +14,7 @@ from .exceptions import TooManyRequests
 from .security import invalidate
 
 from .utils import View, ProcessMobileNumber, InvalidDataError, InvalidDataErrorWelsh, \
-    FlashMessage, RHService, ProcessName, ProcessNumberOfPeople
+    FlashMessage, RHService, ProcessName, ProcessNumberOfPeople, cached_page
 from .session import get_existing_session, get_session_value
 
 logger = get_logger('respondent-home')
@@ -381,7 +381,7 @@ class RequestCodeEnterMobile(RequestCommon):
 
 
 @request_routes.view(r'/' + View.valid_display_regions + '/request/' +
-                     RequestCommon.valid_request_types_code_only + '/confirm-send-by-text/')
+                     RequestCommon.valid_request_types_code_only + '/confirm-send-by-text/', deadline=20)
 class RequestCodeConfirmSendByText(RequestCommon):
     @aiohttp_jinja2.template('request-code-confirm-send-by-text.html')
     async def get(self, request):
@@ -589,7 +589,7 @@ class RequestCommonEnterName(RequestCommon):
 
 
 @request_routes.view(r'/' + View.valid_display_regions + '/request/' +
-                     RequestCommon.valid_request_types_code_and_form + '/confirm-send-by-post/')
+                     RequestCommon.valid_request_types_code_and_form + '/confirm-send-by-post/', deadline=20)
 class RequestCommonConfirmSendByPost(RequestCommon):
     @aiohttp_jinja2.template('request-common-confirm-send-by-post.html')
     async def get(self, request):
@@ -717,21 +717,16 @@ class RequestCommonConfirmSendByPost(RequestCommon):
                 fulfilment_type_array = []
 
                 try:
-                    available_fulfilments = await RHService.get_fulfilment(
+                    fulfilment_codes = await RHService.get_fulfilment_codes(
                         request,
                         attributes['case_type'],
                         attributes['region'],
                         'POST',
-                        fulfilment_type,
-                        fulfilment_individual)
-
-                    if len(available_fulfilments) > 1:
-                        for fulfilment in available_fulfilments:
-                            if fulfilment['language'] == fulfilment_language:
-                                fulfilment_code_array.append(fulfilment['fulfilmentCode'])
-                    else:
-                        fulfilment_code_array.append(available_fulfilments[0]['fulfilmentCode'])
+                        [fulfilment_type],
+                        fulfilment_individual,
+                        fulfilment_language)
 
+                    fulfilment_code_array.extend(fulfilment_codes[fulfilment_type])
                     fulfilment_type_array.append(fulfilment_type)
 
                     room_number_value = attributes['roomNumber']
@@ -812,69 +807,36 @@ class RequestCommonConfirmSendByPost(RequestCommon):
                 number_of_large_print_forms = required_forms['number_of_large_print_forms']
 
                 try:
+                    product_groups = []
                     if number_of_household_forms == 1:
-                        available_fulfilments = await RHService.get_fulfilment(
-                            request,
-                            attributes['case_type'],
-                            attributes['region'],
-                            'POST',
-                            'QUESTIONNAIRE',
-                            fulfilment_individual)
-
-                        if len(available_fulfilments) > 1:
-                            for fulfilment in available_fulfilments:
-                                if fulfilment['language'] == fulfilment_language:
-                                    fulfilment_code_array.append(fulfilment['fulfilmentCode'])
-                        else:
-                            fulfilment_code_array.append(available_fulfilments[0]['fulfilmentCode'])
+                        product_groups.append('QUESTIONNAIRE')
+                    if number_of_continuation_forms > 0:
+                        product_groups.append('CONTINUATION')
+                    if number_of_large_print_forms > 0:
+                        product_groups.append('LARGE_PRINT')
 
+                    fulfilment_codes = await RHService.get_fulfilment_codes(
+                        request,
+                        attributes['case_type'],
+                        attributes['region'],
+                        'POST',
+                        product_groups,
+                        fulfilment_individual,
+                        fulfilment_language)
+
+                    if number_of_household_forms == 1:
+                        fulfilment_code_array.extend(fulfilment_codes['QUESTIONNAIRE'])
                         fulfilment_type_array.append('QUESTIONNAIRE')
 
                     if number_of_continuation_forms > 0:
-                        count = 1
-                        fulfilment_code = ''
-                        available_fulfilments = await RHService.get_fulfilment(
-                            request,
-                            attributes['case_type'],
-                            attributes['region'],
-                            'POST',
-                            'CONTINUATION',
-                            fulfilment_individual)
-
-                        if len(available_fulfilments) > 1:
-                            for fulfilment in available_fulfilments:
-                                if fulfilment['language'] == fulfilment_language:
-                                    fulfilment_code = fulfilment['fulfilmentCode']
-                        else:
-                            fulfilment_code = available_fulfilments[0]['fulfilmentCode']
-
-                        while count <= number_of_continuation_forms:
-                            fulfilment_code_array.append(fulfilment_code)
-                            fulfilment_type_array.append('CONTINUATION')
-                            count += 1
+                        fulfilment_code = (fulfilment_codes['CONTINUATION'] or [''])[-1]
+                        fulfilment_code_array.extend([fulfilment_code] * number_of_continuation_forms)
+                        fulfilment_type_array.extend(['CONTINUATION'] * number_of_continuation_forms)
 
                     if number_of_large_print_forms > 0:
-                        count = 1
-                        fulfilment_code = ''
-                        available_fulfilments = await RHService.get_fulfilment(
-                            request,
-                            attributes['case_type'],
-                            attributes['region'],
-                            'POST',
-                            'LARGE_PRINT',
-                            fulfilment_individual)
-
-                        if len(available_fulfilments) > 1:
-                            for fulfilment in available_fulfilments:
-                                if fulfilment['language'] == fulfilment_language:
-                                    fulfilment_code = fulfilment['fulfilmentCode']
-                        else:
-                            fulfilment_code = available_fulfilments[0]['fulfilmentCode']
-
-                        while count <= number_of_large_print_forms:
-                            fulfilment_code_array.append(fulfilment_code)
-                            fulfilment_type_array.append('LARGE_PRINT')
-                            count += 1
+                        fulfilment_code = (fulfilment_codes['LARGE_PRINT'] or [''])[-1]
+                        fulfilment_code_array.extend([fulfilment_code] * number_of_large_print_forms)
+                        fulfilment_type_array.extend(['LARGE_PRINT'] * number_of_large_print_forms)
 
                     logger.info(
                         f"fulfilment query: case_type={attributes['case_type']}, "
@@ -1104,6 +1066,7 @@ class RequestCommonPeopleInHousehold(RequestCommon):
 
 @request_routes.view(r'/' + View.valid_ew_display_regions + '/request/paper-questionnaire/manager/')
 class RequestQuestionnaireManager(RequestCommon):
+    @cached_page
     @aiohttp_jinja2.template('request-questionnaire-manager.html')
     async def get(self, request):
 
@@ -1297,6 +1260,7 @@ class RequestLargePrintSentPost(RequestCommon):
 
 @request_routes.view(r'/ni/request/access-code/ce-manager/')
 class RequestCodeNIManager(RequestCommon):
+    @cached_page
     @aiohttp_jinja2.template('request-code-nisra-manager.html')
     async def get(self, request):
 
@@ -1314,6 +1278,7 @@ class RequestCodeNIManager(RequestCommon):
 
 @request_routes.view(r'/ni/request/paper-questionnaire/ce-manager/')
 class RequestFormNIManager(RequestCommon):
+    @cached_page
     @aiohttp_jinja2.template('request-questionnaire-nisra-manager.html')
     async def get(self, request):
 
@@ -0,0 +1,56 @@
+import time
+
+from collections import deque
+
+
+class RetryBudget:
+    """
+    Limit the retries made to an upstream service to min_retries plus ratio of the requests made to it over the last
+    window seconds, so that when the service is overloaded retries do not multiply the load on it.
+    Counts retries spent and retries denied.
+    """
+    def __init__(self, name, ratio=0.2, min_retries=10, window=10):
+        self.name = name
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        # [second, requests, retries] for each second of the window with any
+        self._buckets = deque()
+        self.spent = 0
+        self.denied = 0
+
+    def _bucket(self) -> list:
+        now = int(time.monotonic())
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        return self._buckets[-1]
+
+    def _totals(self) -> tuple:
+        self._bucket()
+        return sum(bucket[1] for bucket in self._buckets), sum(bucket[2] for bucket in self._buckets)
+
+    def record_request(self):
+        self._bucket()[1] += 1
+
+    def spend(self) -> bool:
+        """
+        Take a retry from the budget, returning False if there is none left.
+        """
+        requests, retries = self._totals()
+        if retries >= self.min_retries + self.ratio * requests:
+            self.denied += 1
+            return False
+        self._bucket()[2] += 1
+        self.spent += 1
+        return True
+
+    def stats(self) -> dict:
+        requests, retries = self._totals()
+        return {
+            'requests_in_window': requests,
+            'retries_in_window': retries,
+            'spent': self.spent,
+            'denied': self.denied
+        }
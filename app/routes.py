@@ -10,13 +10,18 @@ from .support_centre_handlers import support_centre_routes
 
 
 def setup(app, url_path_prefix):
-    """Set up routes as resources so we can use the `Index:get` notation for URL lookup."""
+    """
+    Set up routes as resources so we can use the `Index:get` notation for URL lookup.
+    Routes given a deadline keep it in app.route_deadlines, by resource class.
+    """
 
     combined_routes = [*request_routes, *start_routes, *static_routes, *web_form_routes,
                        *webchat_routes, *common_routes, *support_centre_routes]
 
     for route in combined_routes:
         use_prefix = route.kwargs.get('use_prefix', True)
+        if 'deadline' in route.kwargs:
+            app.route_deadlines[route.handler] = route.kwargs['deadline']
         prefix = url_path_prefix if use_prefix else ''
         with add_resource_context(app,
                                   module='app.handlers',
@@ -1,6 +1,5 @@
-import random
-import string
 import hashlib
+import secrets
 
 from aiohttp import web
 from aiohttp_session import get_session, Session
@@ -77,42 +76,76 @@ ADD_NONCE_SECTIONS = [
     'script-src',
 ]
 
-SESSION_KEY = 'identity'
 
-rnd = random.SystemRandom()
+def _render_header(value, nonce=None):
+    if isinstance(value, dict):
+        return '; '.join([
+            f"{section} {' '.join(content)} 'nonce-{nonce}'"
+            if nonce is not None and section in ADD_NONCE_SECTIONS else
+            f"{section} {' '.join(content)}"
+            for section, content in value.items()
+        ])
+    elif not isinstance(value, str):
+        return ' '.join(value)
+    return value
+
+
+def _compile_headers(headers):
+    """
+    Render the response headers once, leaving only the nonce to be spliced in per response.
+    Returns the headers without a nonce, the headers with a nonce as the text either side of it,
+    and those same headers as sent on responses that are not HTML, which have no use for a nonce.
+    """
+    placeholder = '\0nonce\0'
+    static_headers, nonce_headers, no_nonce_headers = {}, {}, {}
+    for header, value in headers.items():
+        parts = _render_header(value, placeholder).split(placeholder)
+        if len(parts) == 1:
+            static_headers[header] = parts[0]
+        else:
+            nonce_headers[header] = parts
+            no_nonce_headers[header] = _render_header(value)
+    return static_headers, nonce_headers, no_nonce_headers
+
+
+STATIC_RESPONSE_HEADERS, NONCE_RESPONSE_HEADERS, NO_NONCE_RESPONSE_HEADERS = _compile_headers(DEFAULT_RESPONSE_HEADERS)
+
+NONCE_KEY = 'csp_nonce'
+
+SESSION_KEY = 'identity'
 
 logger = get_logger('respondent-home')
 
 
 def get_random_string(length):
-    allowed_chars = (string.ascii_lowercase + string.ascii_uppercase +
-                     string.digits)
-    return ''.join(rnd.choice(allowed_chars) for _ in range(length))
+    # a single draw from the OS entropy source, url safe base64 characters are valid in a CSP nonce
+    return secrets.token_urlsafe(length)[:length]
 
 
-@web.middleware
-async def nonce_middleware(request, handler):
-    request.csp_nonce = get_random_string(16)
-    return await handler(request)
+def get_nonce(request):
+    """
+    Return the CSP nonce for the request, generated the first time it is needed.
+    """
+    try:
+        return request[NONCE_KEY]
+    except KeyError:
+        nonce = request[NONCE_KEY] = get_random_string(16)
+        return nonce
 
 
 async def on_prepare(request: web.BaseRequest, response: web.StreamResponse):
-    for header, value in DEFAULT_RESPONSE_HEADERS.items():
-        if isinstance(value, dict):
-            value = '; '.join([
-                f"{section} {' '.join(content)} 'nonce-{request.csp_nonce}'"
-                if section in ADD_NONCE_SECTIONS else
-                f"{section} {' '.join(content)}"
-                for section, content in value.items()
-            ])
-        elif not isinstance(value, str):
-            value = ' '.join(value)
-        response.headers[header] = value
+    response.headers.update(STATIC_RESPONSE_HEADERS)
+    if response.content_type == 'text/html':
+        nonce = get_nonce(request)
+        for header, parts in NONCE_RESPONSE_HEADERS.items():
+            response.headers[header] = nonce.join(parts)
+    else:
+        response.headers.update(NO_NONCE_RESPONSE_HEADERS)
 
 
 async def context_processor(request):
     return {
-        'cspNonce': request.csp_nonce,
+        'cspNonce': get_nonce(request),
     }
 
 
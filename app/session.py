@@ -1,14 +1,20 @@
+import asyncio
 import time
+import uuid
 
-from asyncio import get_event_loop
-from aioredis import create_pool, RedisError
-from aiohttp_session import session_middleware, Session, get_session
-from aiohttp_session.redis_storage import RedisStorage
+from collections import Counter, defaultdict
+
+from aioredis import ConnectionPool, Redis, RedisError, UnixDomainSocketConnection
+from aioredis.exceptions import ConnectionError as RedisConnectionError
+from aiohttp_session import session_middleware, AbstractStorage, Session, get_session, SESSION_KEY, STORAGE_KEY
 from structlog import get_logger
 from .exceptions import SessionTimeout
 
 logger = get_logger('respondent-home')
 
+# the session data as loaded from Redis, kept on the request to tell whether the session really changed
+LOADED_DATA_KEY = 'rh_session_loaded_data'
+
 # Please see https://github.com/aio-libs/aiohttp-session/issues/344
 # Anomalous behaviour can arise where you have a valid session cookie from the client as if a session was created by
 # a previous request but cannot retrieve the session data in Redis, although the data will be in Redis. This behaviour
@@ -36,31 +42,195 @@ def aiohttp_session_pr_331_rollback(self, identity, *, data, new,
         self._mapping.update(session_data)
 
 
+class SessionStats:
+    """
+    Counts session reads, writes and writes skipped because the session was unchanged, per route.
+    """
+    def __init__(self):
+        self.routes = defaultdict(Counter)
+
+    def record(self, request, event):
+        route = request.match_info.route
+        self.routes[getattr(route, 'name', None) or 'unmatched'][event] += 1
+
+    def stats(self) -> dict:
+        return {route: dict(counts) for route, counts in sorted(self.routes.items())}
+
+
+class RHRedisStorage(AbstractStorage):
+    """
+    Redis session storage using the connection pool created when the app starts up, see on_startup.
+    Session data is encoded with the app's session codec, see session_codec.
+    Loading a session also refreshes its time to live in the same round trip, so an unchanged session is not
+    written back just to keep it alive, even where a handler has reassigned a value without changing it.
+    It can also keep short lived data for a session under its own key, so that bulky values do not have to be carried
+    in the session itself.
+    """
+    def __init__(self, *, data_max_age, key_factory=lambda: uuid.uuid4().hex, **kwargs):
+        super().__init__(**kwargs)
+        self.data_max_age = data_max_age
+        self._key_factory = key_factory
+
+    @staticmethod
+    def _redis(request) -> Redis:
+        redis = request.app.redis_pool
+        if redis is None:
+            raise RedisConnectionError('redis is not configured')
+        return redis
+
+    def _session_key(self, identity):
+        return f'{self.cookie_name}_{identity}'
+
+    def _data_key(self, identity, name):
+        return f'{self.cookie_name}_{identity}_{name}'
+
+    async def load_session(self, request):
+        cookie = self.load_cookie(request)
+        if cookie is None:
+            return Session(None, data=None, new=True, max_age=self.max_age)
+        key = str(cookie)
+        session_key = self._session_key(key)
+        if self.max_age:
+            async with self._redis(request).pipeline(transaction=False) as pipe:
+                data, _ = await pipe.get(session_key).expire(session_key, self.max_age).execute()
+        else:
+            data = await self._redis(request).get(session_key)
+        request.app.session_stats.record(request, 'reads')
+        if data is None:
+            return Session(None, data=None, new=True, max_age=self.max_age)
+        request[LOADED_DATA_KEY] = data
+        try:
+            data = request.app.session_codec.decode(data)
+        except ValueError:
+            data = None
+        return Session(key, data=data, new=False, max_age=self.max_age)
+
+    async def save_session(self, request, response, session):
+        key = session.identity
+        if key is None:
+            key = self._key_factory()
+            self.save_cookie(response, key, max_age=session.max_age)
+        elif session.empty:
+            self.save_cookie(response, '', max_age=session.max_age)
+        else:
+            key = str(key)
+            self.save_cookie(response, key, max_age=session.max_age)
+
+        data = request.app.session_codec.encode(self._get_session_data(session))
+        if session.identity is not None and data == request.get(LOADED_DATA_KEY):
+            request.app.session_stats.record(request, 'skipped_writes')
+            return
+        await self._redis(request).set(self._session_key(key), data, ex=session.max_age or None)
+        request[LOADED_DATA_KEY] = data
+        request.app.session_stats.record(request, 'writes')
+        request.app.session_codec.sizes.record(len(data))
+
+    async def load_data(self, request, identity, name):
+        data = await self._redis(request).get(self._data_key(identity, name))
+        if data is None:
+            return None
+        return request.app.session_codec.decode(data)
+
+    async def save_data(self, request, identity, name, value):
+        await self._redis(request).set(self._data_key(identity, name), request.app.session_codec.encode(value),
+                                       ex=self.data_max_age or None)
+
+
 def setup(app_config):
     # Monkey patch aiohttp_session.py Session.__init__ method to remove PR 331 as above
     Session.__init__ = aiohttp_session_pr_331_rollback
 
-    loop = get_event_loop()
-    redis_pool = loop.run_until_complete(
-        make_redis_pool(app_config['REDIS_SERVER'], app_config['REDIS_PORT'], app_config['REDIS_POOL_MIN'], app_config['REDIS_POOL_MAX']))
     return session_middleware(
-        RedisStorage(redis_pool,
-                     cookie_name='RH_SESSION',
-                     max_age=int(app_config['SESSION_AGE'])))
+        RHRedisStorage(cookie_name='RH_SESSION',
+                       max_age=int(app_config['SESSION_AGE']),
+                       data_max_age=int(app_config['SESSION_DATA_AGE'])))
+
 
+async def on_startup(app):
+    """
+    Create the Redis client for session storage. An empty REDIS_SERVER and REDIS_UNIX_SOCKET disables session
+    storage, otherwise failing to connect stops the app from starting rather than serving requests without sessions.
+    """
+    app.redis_pool = None
+    if not app['REDIS_SERVER'] and not app['REDIS_UNIX_SOCKET']:
+        logger.warn('redis server not configured, session storage disabled')
+        return
+    app.redis_pool = await make_redis_pool(app['REDIS_SERVER'], app['REDIS_PORT'],
+                                           app['REDIS_POOL_MIN'], app['REDIS_POOL_MAX'],
+                                           unix_socket=app['REDIS_UNIX_SOCKET'])
 
-async def make_redis_pool(host, port, poolMin, poolMax):
-    redis_address = (host, port)
+
+async def on_cleanup(app):
+    if app.redis_pool is not None:
+        await app.redis_pool.close()
+        await app.redis_pool.connection_pool.disconnect()
+        app.redis_pool = None
+
+
+async def make_redis_pool(host, port, poolMin, poolMax, unix_socket=None) -> Redis:
+    """
+    Connections are opened as they are needed, up to poolMax. poolMin are opened up front, which also checks that
+    Redis can be reached.
+    """
+    if unix_socket:
+        pool = ConnectionPool(connection_class=UnixDomainSocketConnection, path=unix_socket,
+                              socket_connect_timeout=3, max_connections=int(poolMax))
+    else:
+        pool = ConnectionPool(host=host, port=int(port), socket_connect_timeout=3, max_connections=int(poolMax))
     try:
-        redis_pool = await create_pool(
-            redis_address,
-            create_connection_timeout=3,
-            minsize=int(poolMin),
-            maxsize=int(poolMax)
-        )
-        return redis_pool
-    except (OSError, RedisError):
-        logger.error('failed to create redis connection')
+        connections = [await pool.get_connection('PING') for _ in range(max(int(poolMin), 1))]
+        for connection in connections:
+            await pool.release(connection)
+    except (OSError, RedisError, asyncio.TimeoutError):
+        logger.error('failed to create redis connection', host=host, port=port, unix_socket=unix_socket)
+        await pool.disconnect()
+        raise
+    logger.info('redis connection pool created', host=host, port=port, unix_socket=unix_socket)
+    return Redis(connection_pool=pool)
+
+
+async def check_redis(app) -> bool:
+    """
+    Health check for session storage, true if Redis is not configured.
+    """
+    if app.redis_pool is None:
+        return True
+    try:
+        await asyncio.wait_for(app.redis_pool.ping(), 3)
+    except (OSError, RedisError, asyncio.TimeoutError):
+        logger.error('failed to connect to redis')
+        return False
+    return True
+
+
+def redis_pool_stats(app) -> dict:
+    if app.redis_pool is None:
+        return {'enabled': False}
+    pool = app.redis_pool.connection_pool
+    return {
+        'enabled': True,
+        'size': len(pool._available_connections) + len(pool._in_use_connections),
+        'in_use': len(pool._in_use_connections),
+        'maxsize': pool.max_connections
+    }
+
+
+def has_session_cookie(request) -> bool:
+    """
+    Whether the request carries a session cookie, so whether loading its session could find anything.
+    """
+    storage = request.get(STORAGE_KEY)
+    return storage is not None and bool(storage.load_cookie(request))
+
+
+async def save_session_before_prepare(request, response):
+    """
+    Save the session, if it has changed, into a response streamed from its handler, which session_middleware leaves
+    alone as it is already sent by the time the handler returns.
+    """
+    session = request.get(SESSION_KEY)
+    if session is not None and session._changed:
+        await request[STORAGE_KEY].save_session(request, response, session)
 
 
 async def get_existing_session(request, user_journey, sub_user_journey=None) -> Session:
@@ -79,5 +249,44 @@ def get_session_value(session, key, user_journey, sub_user_journey=None):
     try:
         return session[key]
     except KeyError:
-        logger.info(f'Failed to extract session key {key}', client_id=session['client_id'])
+        logger.info(f'Failed to extract session key {key}', client_id=session.get('client_id'))
         raise SessionTimeout(user_journey, sub_user_journey)
+
+
+async def get_session_data(request, name):
+    """
+    Return short lived data held alongside the current session, or None if there is none or the storage
+    in use cannot hold it.
+    """
+    storage = request.get(STORAGE_KEY)
+    session = await get_session(request)
+    if not isinstance(storage, RHRedisStorage) or session.identity is None:
+        return None
+    try:
+        return await storage.load_data(request, session.identity, name)
+    except (OSError, RedisError, ValueError):
+        logger.warn('failed to load session data',
+                    client_ip=request['client_ip'],
+                    client_id=request['client_id'],
+                    trace=request['trace'],
+                    data_name=name)
+        return None
+
+
+async def set_session_data(request, name, value):
+    """
+    Store short lived data alongside the current session. Failures are logged and otherwise ignored,
+    as the data can always be rebuilt.
+    """
+    storage = request.get(STORAGE_KEY)
+    session = await get_session(request)
+    if not isinstance(storage, RHRedisStorage) or session.identity is None:
+        return
+    try:
+        await storage.save_data(request, session.identity, name, value)
+    except (OSError, RedisError):
+        logger.warn('failed to save session data',
+                    client_ip=request['client_ip'],
+                    client_id=request['client_id'],
+                    trace=request['trace'],
+                    data_name=name)
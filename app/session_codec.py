@@ -0,0 +1,76 @@
+import bisect
+import json
+import zlib
+
+import msgpack
+
+# the first byte of an encoded session marks its encoding, JSON sessions always start with '{'
+MSGPACK = b'\x01'
+MSGPACK_ZLIB = b'\x02'
+
+# upper bounds of the session size histogram buckets, in bytes
+SIZE_BUCKETS = [256, 512, 1024, 2048, 4096, 8192, 16384, 32768]
+
+
+class SizeHistogram:
+
+    def __init__(self, buckets=SIZE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+
+    def record(self, size):
+        self.counts[bisect.bisect_left(self.buckets, size)] += 1
+        self.total += size
+
+    def stats(self) -> dict:
+        labels = [f'<={bucket}' for bucket in self.buckets] + [f'>{self.buckets[-1]}']
+        count = sum(self.counts)
+        return {
+            'count': count,
+            'mean': round(self.total / count) if count else 0,
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class SessionCodec:
+    """
+    Encodes session data as JSON, or as msgpack, zlib compressed when larger than compress_threshold bytes.
+    Decodes any of these whichever encoding is in use, so sessions written before a change of codec can still be read.
+    """
+    def __init__(self, name, compress_threshold):
+        if name not in ('json', 'msgpack'):
+            raise ValueError(f'unknown session codec {name}')
+        self.name = name
+        self.compress_threshold = compress_threshold
+        self.sizes = SizeHistogram()
+
+    def encode(self, value) -> bytes:
+        if self.name == 'json':
+            return json.dumps(value).encode('utf-8')
+        data = msgpack.packb(value, use_bin_type=True)
+        if 0 < self.compress_threshold < len(data):
+            return MSGPACK_ZLIB + zlib.compress(data)
+        return MSGPACK + data
+
+    @staticmethod
+    def decode(data: bytes):
+        """
+        Raises ValueError if data cannot be decoded.
+        """
+        marker = data[:1]
+        try:
+            if marker == MSGPACK:
+                return msgpack.unpackb(data[1:], raw=False)
+            if marker == MSGPACK_ZLIB:
+                return msgpack.unpackb(zlib.decompress(data[1:]), raw=False)
+            return json.loads(data.decode('utf-8'))
+        except (zlib.error, msgpack.UnpackException, UnicodeDecodeError) as ex:
+            raise ValueError(f'invalid session data: {ex}') from ex
+
+    def stats(self) -> dict:
+        return {
+            'codec': self.name,
+            'compress_threshold': self.compress_threshold,
+            'sizes': self.sizes.stats()
+        }
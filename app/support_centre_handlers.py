@@ -5,7 +5,7 @@ from aiohttp.web import RouteTableDef, HTTPFound
 from structlog import get_logger
 
 from .flash import flash
-from .utils import View, ProcessPostcode, InvalidDataError, InvalidDataErrorWelsh, FlashMessage, ADLookUp
+from .utils import View, ProcessPostcode, InvalidDataError, InvalidDataErrorWelsh, FlashMessage, ADLookUp, cached_page
 
 logger = get_logger('respondent-home')
 support_centre_routes = RouteTableDef()
@@ -13,6 +13,7 @@ support_centre_routes = RouteTableDef()
 
 @support_centre_routes.view(r'/' + View.valid_ew_display_regions + '/find-a-support-centre/')
 class SupportCentreEnterPostcode(View):
+    @cached_page
     @aiohttp_jinja2.template('support_centre_enter_postcode.html')
     async def get(self, request):
         display_region = request.match_info['display_region']
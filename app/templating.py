@@ -0,0 +1,194 @@
+import asyncio
+import os
+import tempfile
+import time
+
+from contextlib import suppress
+
+import aiohttp_jinja2
+from aiohttp import web
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from jinja2.utils import Markup
+from structlog import get_logger
+
+from .flash import pop_flash_before_prepare
+from .session import save_session_before_prepare
+
+logger = get_logger('respondent-home')
+
+TEMPLATE_EXTENSIONS = ('html', 'njk')
+
+# bytes of a streamed page gathered before each write
+STREAM_BUFFER_SIZE = 16 * 1024
+
+
+class SharedBytecodeCache(FileSystemBytecodeCache):
+    """
+    A FileSystemBytecodeCache that workers can share. Bytecode is written to a temporary file and renamed into place,
+    so that no worker loads a partly written file, and a directory that cannot be written to, such as one precompiled
+    into the image, means bytecode is not saved rather than the template failing to render.
+    """
+    def dump_bytecode(self, bucket):
+        path = None
+        try:
+            fd, path = tempfile.mkstemp(dir=self.directory)
+            os.fchmod(fd, 0o644)
+            with os.fdopen(fd, 'wb') as fp:
+                bucket.write_bytecode(fp)
+            os.replace(path, self._get_cache_filename(bucket))
+        except OSError as ex:
+            logger.warn('could not save template bytecode', directory=self.directory, error=repr(ex))
+            if path:
+                with suppress(OSError):
+                    os.remove(path)
+
+
+class TemplatePrecompiler:
+    """
+    Compile every template as a worker starts, rather than each the first time it is rendered, through a bytecode
+    cache in directory shared by the workers, so that once `inv precompile` has filled it they only need to load it.
+    Does nothing without a directory.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.templates = 0
+        self.load_ms = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def bytecode_cache(self):
+        return SharedBytecodeCache(self.directory) if self.enabled else None
+
+    def compile(self, env) -> int:
+        started = time.perf_counter()
+        names = env.list_templates(extensions=TEMPLATE_EXTENSIONS)
+        for name in names:
+            env.get_template(name)
+        self.templates = len(names)
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        return self.templates
+
+    async def on_startup(self, app):
+        if self.enabled:
+            self.compile(aiohttp_jinja2.get_env(app))
+            logger.info('templates loaded', templates=self.templates, load_ms=self.load_ms, directory=self.directory)
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'templates': self.templates,
+            'load_ms': self.load_ms
+        }
+
+
+class FragmentCache:
+    """
+    Output of the {% cache %} regions of templates, for the life of the worker, keyed on the template, the region's
+    name and any other values it is given, and the display_region and locale it is rendered in.
+    The request's cspNonce is cut out of the output when it is saved and spliced back in, as its response headers are,
+    when it is reused, so regions must not otherwise depend on the request. A maxsize of 0 disables it.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._fragments = {}
+
+    def render(self, context, key, caller):
+        key = (*key, context.get('display_region'), context.get('locale'))
+        nonce = context.get('cspNonce') or ''
+        parts = self._fragments.get(key)
+        if parts is None:
+            self.misses += 1
+            output = caller()
+            if len(self._fragments) < self.maxsize:
+                self._fragments[key] = str(output).split(nonce) if nonce else [str(output)]
+            return output
+        self.hits += 1
+        output = nonce.join(parts)
+        return Markup(output) if context.eval_ctx.autoescape else output
+
+    def clear(self):
+        self._fragments.clear()
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._fragments),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Adds {% cache 'name' %}...{% endcache %}, rendering its contents once per worker for each display_region and
+    locale, through environment.fragment_cache. Further values to key it on follow the name, comma separated.
+    """
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache(0))
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [nodes.Const(parser.name), parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render', [nodes.ContextReference(), nodes.List(key)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, context, key, caller):
+        return self.environment.fragment_cache.render(context, key, caller)
+
+
+async def stream_template(template_name, request, context) -> web.StreamResponse:
+    """
+    Render a template as aiohttp_jinja2.template does, but send the page as it is rendered, for pages long enough,
+    such as a postcode's thousands of addresses, that the browser should not wait for it all, nor the worker hold it
+    all, encoded and not, at once.
+    The session cannot be saved into a response once it is sent, so flashed messages are popped and the session saved
+    first, and the page is given the popped messages. The template is rendered up to its first output before the
+    response is sent, so that errors in setting it up still get an error page. Once sent, an error can only be logged
+    and the connection closed.
+    """
+    template = aiohttp_jinja2.get_env(request.app).get_template(template_name)
+    messages = await pop_flash_before_prepare(request)
+    context = dict(request.get(aiohttp_jinja2.REQUEST_CONTEXT_KEY, {}), **context,
+                   get_flashed_messages=lambda: messages)
+    chunks = template.generate(context)
+    first = next(chunks, '')
+    response = web.StreamResponse()
+    response.content_type = 'text/html'
+    response.charset = 'utf-8'
+    await save_session_before_prepare(request, response)
+    await response.prepare(request)
+    try:
+        buffer, size = [first], len(first)
+        for chunk in chunks:
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_BUFFER_SIZE:
+                await response.write(''.join(buffer).encode('utf-8'))
+                buffer, size = [], 0
+                # let the worker's other requests on while the rest is rendered
+                await asyncio.sleep(0)
+        await response.write(''.join(buffer).encode('utf-8'))
+        await response.write_eof()
+    except asyncio.CancelledError:
+        raise
+    except Exception as ex:
+        logger.error('error streaming page',
+                     client_ip=request['client_ip'],
+                     client_id=request['client_id'],
+                     trace=request['trace'],
+                     template=template_name,
+                     error=repr(ex))
+        if request.transport is not None:
+            request.transport.close()
+    return response
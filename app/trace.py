@@ -1,7 +1,15 @@
+import hashlib
+import hmac
+
 from aiohttp import web
 from aiohttp_session import get_session
 from uuid import uuid4
 
+from .session import has_session_cookie
+
+CLIENT_ID_COOKIE = 'RH_CLIENT_ID'
+NEW_CLIENT_ID_KEY = 'new_client_id'
+
 
 def get_trace(headers):
     try:
@@ -11,13 +19,53 @@ def get_trace(headers):
     return trace
 
 
+def sign_client_id(secret, client_id):
+    return hmac.new(secret.encode(), client_id.encode(), hashlib.sha256).hexdigest()
+
+
+def load_client_id(request):
+    """
+    Return the client_id from the signed client id cookie, or None if there is no valid one.
+    """
+    try:
+        client_id, signature = request.cookies[CLIENT_ID_COOKIE].rsplit('.', 1)
+    except (KeyError, ValueError):
+        return None
+    if not hmac.compare_digest(signature, sign_client_id(request.app['CLIENT_ID_SECRET'], client_id)):
+        return None
+    return client_id
+
+
+def save_client_id(request, response, client_id):
+    response.set_cookie(CLIENT_ID_COOKIE,
+                        f"{client_id}.{sign_client_id(request.app['CLIENT_ID_SECRET'], client_id)}",
+                        httponly=True)
+
+
+async def get_session_client_id(request):
+    """
+    Fall back to the client_id held in an existing session, only loading the session if there is a session cookie.
+    """
+    if not has_session_cookie(request):
+        return None
+    session = await get_session(request)
+    return session.get('client_id')
+
+
 @web.middleware
 async def trace_middleware(request, handler):
     request['trace'] = get_trace(request.headers)
     request['client_ip'] = request.headers.get('X-Forwarded-For')
-    session = await get_session(request)
-    if 'client_id' in session:
-        request['client_id'] = session['client_id']
+    client_id = load_client_id(request)
+    if client_id:
+        request['client_id'] = client_id
     else:
-        session['client_id'] = request['client_id'] = str(uuid4())
+        # the signed cookie is set by on_prepare, so that responses streamed from their handlers get it too
+        request['client_id'] = await get_session_client_id(request) or str(uuid4())
+        request[NEW_CLIENT_ID_KEY] = True
     return await handler(request)
+
+
+async def on_prepare(request: web.BaseRequest, response: web.StreamResponse):
+    if request.get(NEW_CLIENT_ID_KEY):
+        save_client_id(request, response, request['client_id'])
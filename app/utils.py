@@ -1,19 +1,23 @@
+import asyncio
+import functools
 import string
 import re
 import math
 
 from aiohttp.client_exceptions import (ClientResponseError)
 from .exceptions import InactiveCaseError, InvalidEqPayLoad, InvalidDataError, InvalidDataErrorWelsh, \
-    TooManyRequestsEQLaunch
-from aiohttp.web import HTTPFound
+    TooManyRequestsEQLaunch, DeadlineExceeded
+from aiohttp.web import HTTPFound, Response
 from datetime import datetime, date
 from pytz import timezone, utc
 from unicodedata import normalize
 
 from sdc.crypto.encrypter import encrypt
 from .eq import EqPayloadConstructor
-from .flash import flash
+from .flash import flash, REQUEST_KEY as FLASH_KEY
 from .request import RetryRequest
+from .security import NONCE_KEY, get_nonce
+from .session import get_session_data, set_session_data
 from structlog import get_logger
 
 logger = get_logger('respondent-home')
@@ -160,7 +164,25 @@ class View:
         :param return_json: If True, the response JSON will be returned
         """
         retry_request = RetryRequest(request, method, url, auth, headers, request_json, return_json)
-        return await retry_request.make_request()
+        if method != 'GET':
+            return await retry_request.make_request()
+
+        # identical concurrent GETs share a single upstream call
+        key = (url, auth, tuple(sorted(headers.items())) if headers else None, return_json)
+        while True:
+            joined = key in request.app.singleflight
+            if joined:
+                logger.debug('joining in-flight request',
+                             client_ip=request['client_ip'],
+                             client_id=request['client_id'],
+                             trace=request['trace'],
+                             url=url)
+            try:
+                return await request.app.singleflight.do(key, retry_request.make_request)
+            except DeadlineExceeded as ex:
+                # the call joined ran out of its own request's time, so try again with whatever time is left to us
+                if not joined or retry_request.deadline_passed():
+                    raise ex
 
     @staticmethod
     def validate_case(case_json):
@@ -192,6 +214,40 @@ class View:
         raise HTTPFound(f'{eq_url}/session?token={token}')
 
 
+def cached_page(handler):
+    """
+    Serve the page a GET handler renders from app.page_cache, keyed on its path, for pages that only vary with the path.
+    Cached views don't read the query string, so it is dropped before rendering and campaign or analytics parameters
+    such as utm_source share the page rendered for the bare path.
+    The page is stored with the request's CSP nonce cut out, and a new nonce spliced in each time it is served.
+    Requests with flashed messages are always rendered.
+    """
+    @functools.wraps(handler)
+    async def wrapped(self, request):
+        if request.get(FLASH_KEY):
+            return await handler(self, request)
+        key = request.rel_url.path
+        page = request.app.page_cache.get(key)
+        if page is not None:
+            parts, content_type, charset = page
+            endpoint = request.path[len(request.app['URL_PATH_PREFIX']):].strip('/')
+            View.log_entry(request, endpoint)
+            body = get_nonce(request).encode(charset).join(parts)
+            return Response(body=body, content_type=content_type, charset=charset)
+        page_request = request.clone(rel_url=request.rel_url.with_query(None)) if request.query_string else request
+        response = await handler(self, page_request)
+        nonce = page_request.get(NONCE_KEY)
+        if nonce:
+            # the nonce in the response headers is taken from the original request
+            request[NONCE_KEY] = nonce
+        if response.status == 200 and isinstance(response.body, bytes):
+            parts = response.body.split(nonce.encode(response.charset)) if nonce else [response.body]
+            request.app.page_cache.set(key, (parts, response.content_type, response.charset))
+        return response
+
+    return wrapped
+
+
 class ProcessPostcode:
     postcode_validation_pattern = re.compile(
         r'^((AB|AL|B|BA|BB|BD|BH|BL|BN|BR|BS|BT|BX|CA|CB|CF|CH|CM|CO|CR|CT|CV|CW|DA|DD|DE|DG|DH|DL|DN|DT|DY|E|EC|EH|EN|EX|FK|FY|G|GL|GY|GU|HA|HD|HG|HP|HR|HS|HU|HX|IG|IM|IP|IV|JE|KA|KT|KW|KY|L|LA|LD|LE|LL|LN|LS|LU|M|ME|MK|ML|N|NE|NG|NN|NP|NR|NW|OL|OX|PA|PE|PH|PL|PO|PR|RG|RH|RM|S|SA|SE|SG|SK|SL|SM|SN|SO|SP|SR|SS|ST|SW|SY|TA|TD|TF|TN|TQ|TR|TS|TW|UB|W|WA|WC|WD|WF|WN|WR|WS|WV|YO|ZE)(\d[\dA-Z]?[ ]?\d[ABD-HJLN-UW-Z]{2}))$'  # NOQA
@@ -494,8 +550,31 @@ class FlashMessage:
 class AddressIndex(View):
 
     @staticmethod
-    async def get_postcode_return(request, postcode, display_region):
+    async def get_postcode_addresses(request, postcode):
+        """
+        Return the compact address rows for a postcode, reusing those from the session's last postcode search
+        where possible, so that re-rendering the select address page does not go back to AIMS.
+        """
+        ai_epoch = request.app['ADDRESS_INDEX_EPOCH']
+        postcode_addresses = await get_session_data(request, 'addresses')
+        if postcode_addresses and postcode_addresses['postcode'] == postcode and \
+                postcode_addresses['epoch'] == ai_epoch:
+            return postcode_addresses
+
         postcode_return = await AddressIndex.get_ai_postcode(request, postcode)
+        postcode_addresses = {
+            'postcode': postcode,
+            'epoch': ai_epoch,
+            'total': postcode_return['response']['total'],
+            'addresses': [[singleAddress['uprn'], singleAddress['formattedAddress']]
+                          for singleAddress in postcode_return['response']['addresses']]
+        }
+        await set_session_data(request, 'addresses', postcode_addresses)
+        return postcode_addresses
+
+    @staticmethod
+    async def get_postcode_return(request, postcode, display_region):
+        postcode_addresses = await AddressIndex.get_postcode_addresses(request, postcode)
 
         address_options = []
 
@@ -504,13 +583,13 @@ class AddressIndex(View):
         else:
             cannot_find_text = 'I cannot find my address'
 
-        for singleAddress in postcode_return['response']['addresses']:
+        for uprn, formatted_address in postcode_addresses['addresses']:
             address_options.append({
-                'value': singleAddress['uprn'],
+                'value': uprn,
                 'label': {
-                    'text': singleAddress['formattedAddress']
+                    'text': formatted_address
                 },
-                'id': singleAddress['uprn']
+                'id': uprn
             })
 
         address_options.append({
@@ -524,7 +603,7 @@ class AddressIndex(View):
         address_content = {
             'postcode': postcode,
             'addresses': address_options,
-            'total_matches': postcode_return['response']['total']
+            'total_matches': postcode_addresses['total']
         }
 
         return address_content
@@ -533,12 +612,23 @@ class AddressIndex(View):
     async def get_ai_postcode(request, postcode):
         ai_svc_url = request.app['ADDRESS_INDEX_SVC_URL']
         ai_epoch = request.app['ADDRESS_INDEX_EPOCH']
+        cache_key = (postcode, ai_epoch)
+        postcode_return = request.app.postcode_cache.get(cache_key)
+        if postcode_return is not None:
+            logger.debug('address index postcode cache hit',
+                         client_ip=request['client_ip'],
+                         client_id=request['client_id'],
+                         trace=request['trace'],
+                         postcode=postcode)
+            return postcode_return
         url = f'{ai_svc_url}/addresses/rh/postcode/{postcode}?limit=5000&epoch={ai_epoch}'
-        return await View._make_request(request,
-                                        'GET',
-                                        url,
-                                        auth=request.app['ADDRESS_INDEX_SVC_AUTH'],
-                                        return_json=True)
+        postcode_return = await View._make_request(request,
+                                                   'GET',
+                                                   url,
+                                                   auth=request.app['ADDRESS_INDEX_SVC_AUTH'],
+                                                   return_json=True)
+        request.app.postcode_cache.set(cache_key, postcode_return)
+        return postcode_return
 
     @staticmethod
     async def get_ai_uprn(request, uprn):
@@ -596,6 +686,10 @@ class RHService(View):
     @staticmethod
     async def get_fulfilment(request, case_type, region,
                              delivery_channel, product_group, individual):
+        available_fulfilments = request.app.fulfilment_catalogue.find(
+            case_type, region, delivery_channel, product_group, individual)
+        if available_fulfilments:
+            return available_fulfilments
         rhsvc_url = request.app['RHSVC_URL']
         url = f'{rhsvc_url}/fulfilments?caseType={case_type}&region={region}&deliveryChannel={delivery_channel}' \
               f'&productGroup={product_group}&individual={individual}'
@@ -604,6 +698,33 @@ class RHService(View):
                                         url,
                                         return_json=True)
 
+    @staticmethod
+    def select_fulfilment_codes(available_fulfilments, language):
+        """
+        Where a product is offered in more than one language, keep only the codes in the requested language.
+        """
+        if len(available_fulfilments) > 1:
+            return [fulfilment['fulfilmentCode'] for fulfilment in available_fulfilments
+                    if fulfilment['language'] == language]
+        return [available_fulfilments[0]['fulfilmentCode']]
+
+    @staticmethod
+    async def get_fulfilment_codes(request, case_type, region, delivery_channel, product_groups, individual, language):
+        """
+        Look up the fulfilment codes for several product groups concurrently, returned keyed by product group.
+        """
+        results = await asyncio.gather(*[
+            RHService.get_fulfilment(request, case_type, region, delivery_channel, product_group, individual)
+            for product_group in product_groups
+        ], return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return {
+            product_group: RHService.select_fulfilment_codes(available_fulfilments, language)
+            for product_group, available_fulfilments in zip(product_groups, results)
+        }
+
     @staticmethod
     async def request_fulfilment_sms(request, case_id, tel_no, fulfilment_code_array):
         rhsvc_url = request.app['RHSVC_URL']
@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import aiohttp_jinja2
+from aiohttp import ClientError, ClientTimeout
+from structlog import get_logger
+
+from .security import get_random_string
+from .templating import TEMPLATE_EXTENSIONS
+
+logger = get_logger('respondent-home')
+
+# (display_region, locale) each page is rendered in
+REGIONS = (('en', 'en'), ('cy', 'cy'), ('ni', 'en'))
+
+
+class WarmUp:
+    """
+    Do, as a worker starts, the work its first requests would otherwise do: render every page in each region with
+    synthetic context, open keep-alive connections to each upstream service and use the Redis pool's connections.
+    Runs in the background for at most timeout seconds, /info only reports the worker as ready once it is done.
+    A timeout of 0 disables it, the worker being ready straight away.
+    """
+    def __init__(self, timeout, connections):
+        self.timeout = timeout
+        self.connections = connections
+        self.done = not self.enabled
+        self.duration = None
+        self.pages = 0
+        self.page_failures = 0
+        self.connections_opened = 0
+        self._task = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout > 0
+
+    def synthetic_context(self, app, display_region, locale) -> dict:
+        domain_en = app['DOMAIN_URL_PROTOCOL'] + app['DOMAIN_URL_EN']
+        return {
+            'app': app,
+            'display_region': display_region,
+            'locale': locale,
+            'page_title': 'Census 2021',
+            'page_url': '/start/',
+            'domain_url_en': domain_en,
+            'domain_url_cy': app['DOMAIN_URL_PROTOCOL'] + app['DOMAIN_URL_CY'],
+            'domain_url_ni': domain_en + '/ni',
+            'gtm_cont_id': app['GTM_CONTAINER_ID'],
+            'gtm_auth': app['GTM_AUTH'],
+            'cspNonce': get_random_string(16),
+            'get_flashed_messages': lambda: [],
+        }
+
+    async def render_pages(self, app):
+        env = aiohttp_jinja2.get_env(app)
+        # pages only, components and layouts are rendered as part of them
+        names = [name for name in env.list_templates(extensions=TEMPLATE_EXTENSIONS) if '/' not in name]
+        for display_region, locale in REGIONS:
+            context = self.synthetic_context(app, display_region, locale)
+            for name in names:
+                try:
+                    env.get_template(name).render(context)
+                    self.pages += 1
+                except Exception as ex:  # synthetic context does not suit every page, their compiling is warmed anyway
+                    self.page_failures += 1
+                    logger.debug('could not render page while warming up', template=name, error=repr(ex))
+                await asyncio.sleep(0)
+
+    async def open_connections(self, client):
+        async def get():
+            try:
+                async with client.session.get(f'{client.base_url}/info', timeout=ClientTimeout(total=5)) as resp:
+                    await resp.read()
+                self.connections_opened += 1
+            except (ClientError, asyncio.TimeoutError) as ex:
+                logger.warn('could not connect to service while warming up', service=client.name, error=repr(ex))
+
+        await asyncio.gather(*[get() for _ in range(self.connections)])
+
+    async def use_redis_pool(self, app):
+        if app.redis_pool is not None:
+            await asyncio.gather(*[app.redis_pool.ping() for _ in range(int(app['REDIS_POOL_MIN']))])
+
+    async def _warm_up(self, app):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.gather(
+                self.render_pages(app),
+                *[self.open_connections(client) for client in app.http_clients.clients],
+                self.use_redis_pool(app)), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warn('warm up timed out', timeout=self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            logger.warn('warm up failed', error=repr(ex))
+        self.duration = time.perf_counter() - started
+        self.done = True
+        logger.info('warm up complete', **self.stats())
+
+    async def on_startup(self, app):
+        if self.enabled:
+            self._task = asyncio.ensure_future(self._warm_up(app))
+
+    async def on_cleanup(self, app):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'done': self.done,
+            'duration_ms': round(self.duration * 1000, 1) if self.duration is not None else None,
+            'pages': self.pages,
+            'page_failures': self.page_failures,
+            'connections_opened': self.connections_opened
+        }
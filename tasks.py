@@ -17,7 +17,7 @@ def run(ctx, port=None):
 
 
 @task
-def server(ctx, port=None, reload=True, debug=False, production=True):
+def server(ctx, port=None, reload=True, debug=False, production=True, workers=4):
     """Run the gunicorn server"""
     try:
         port = port or env('PORT')
@@ -33,7 +33,7 @@ def server(ctx, port=None, reload=True, debug=False, production=True):
         os.environ['APP_SETTINGS'] = 'ProductionConfig'
 
     command = (
-        'gunicorn "app.app:create_app()" -w 4 '
+        f'gunicorn "app.app:create_app()" -w {workers} '
         f'--bind 0.0.0.0:{port} --worker-class aiohttp.worker.GunicornWebWorker '
         f'--access-logfile - --log-level {log_level}')
 
@@ -42,6 +42,19 @@ def server(ctx, port=None, reload=True, debug=False, production=True):
     run_command(command, echo=True)
 
 
+@task
+def precompile(ctx, directory=None):
+    """Compile the templates into the bytecode cache the workers load them from"""
+    directory = directory or env('TEMPLATE_CACHE_DIR')
+    os.makedirs(directory, exist_ok=True)
+    os.environ['TEMPLATE_CACHE_DIR'] = directory
+    from app.app import create_app
+    import aiohttp_jinja2
+    app = create_app('DevelopmentConfig')
+    templates = app.template_precompiler.compile(aiohttp_jinja2.get_env(app))
+    print(f'compiled {templates} templates into {directory} in {app.template_precompiler.load_ms}ms')
+
+
 @task
 def flake8(ctx):
     """Run flake8 on the codebase"""
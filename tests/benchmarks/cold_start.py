@@ -0,0 +1,88 @@
+"""
+How long a new worker takes to start and to answer its first request for each page, compared with the steady state,
+with templates compiled lazily as each is first rendered and with them loaded at startup from a precompiled bytecode
+cache, as after `inv precompile`.
+
+    python -m tests.benchmarks.cold_start --repeat 50
+
+With templates loaded at startup, first request latency should be close to the steady state, the cost having moved
+into boot, which itself is mostly loading bytecode rather than compiling.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+import aiohttp_jinja2
+from aiohttp import ClientSession
+from aiohttp.test_utils import TestServer
+
+from app import config
+from app.app import create_app
+from tests.benchmarks.journeys import current_commit, percentile
+
+PAGES = [
+    '/en/start/',
+    '/cy/start/',
+    '/ni/start/',
+    '/en/start/address-in-scotland/',
+    '/en/start/code-for-northern-ireland/',
+    '/ni/start/code-for-ce-manager/',
+]
+
+
+async def measure(template_cache_dir, repeat) -> dict:
+    config.TestingConfig.TEMPLATE_CACHE_DIR = template_cache_dir
+    started = time.perf_counter()
+    server = TestServer(create_app('TestingConfig'))
+    await server.start_server()
+    boot = time.perf_counter() - started
+    first, steady = [], []
+    try:
+        async with ClientSession() as client:
+            for path in PAGES:
+                for timings in [first] + [steady] * repeat:
+                    started = time.perf_counter()
+                    async with client.get(server.make_url(path)) as response:
+                        await response.read()
+                    timings.append(time.perf_counter() - started)
+                    if response.status >= 400:
+                        raise RuntimeError(f'GET {path} returned {response.status}')
+    finally:
+        await server.close()
+    return {
+        'boot_ms': round(boot * 1000, 1),
+        'first_request_mean_ms': round(sum(first) / len(first) * 1000, 3),
+        'first_request_max_ms': round(max(first) * 1000, 3),
+        'steady_p50_ms': round(percentile(steady, 50) * 1000, 3),
+        'steady_p99_ms': round(percentile(steady, 99) * 1000, 3)
+    }
+
+
+async def main(args):
+    config.TestingConfig.LOG_LEVEL = config.TestingConfig.EXT_LOG_LEVEL = args.log_level
+    # none of the pages need a session, but session setup needs an age
+    config.TestingConfig.SESSION_AGE = '2700'
+    results = {'lazy': await measure('', args.repeat)}
+    with tempfile.TemporaryDirectory() as directory:
+        # fill the cache as `inv precompile` does, then start a new app from it
+        config.TestingConfig.TEMPLATE_CACHE_DIR = directory
+        app = create_app('TestingConfig')
+        app.template_precompiler.compile(aiohttp_jinja2.get_env(app))
+        results['precompiled'] = await measure(directory, args.repeat)
+
+    output = json.dumps({'commit': current_commit(), 'pages': PAGES, 'repeat': args.repeat, **results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            fp.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='requests for each page after the first')
+    parser.add_argument('--log-level', default='ERROR')
+    parser.add_argument('--output', help='file to write the results to, rather than stdout')
+    asyncio.get_event_loop().run_until_complete(main(parser.parse_args()))
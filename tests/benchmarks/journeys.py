@@ -0,0 +1,188 @@
+"""
+Requests per second and latency percentiles for the key steps of the respondent journeys, through a TestingConfig app
+with its sessions in a fake Redis and its upstream calls made to stub RHSvc and Address Index servers.
+
+    python -m tests.benchmarks.journeys --requests 500 --concurrency 10
+    python -m tests.benchmarks.journeys --journey start --journey launch_eq --output results.json
+
+Each virtual user walks its journey up to the step being measured once, then repeats that step, so every request
+measured goes through the middleware stack, loads and saves a Redis session and makes the handler's upstream calls.
+Results are JSON, keyed by journey and labelled with the commit, so they can be kept per commit and compared.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import time
+
+from aiohttp import ClientSession, CookieJar
+from aiohttp.test_utils import TestServer
+
+from app import config
+from app.app import create_app
+from tests.stubs.fake_redis import FakeRedisServer
+from tests.stubs.upstream import create_address_index_app, create_rhsvc_app
+
+SAVE = {'action[save_continue]': ''}
+
+REQUEST_ADDRESS = [
+    ('GET', '/en/request/access-code/enter-address/', None),
+    ('POST', '/en/request/access-code/enter-address/', {'form-enter-address-postcode': 'EX2 6GA', **SAVE}),
+]
+REQUEST_CONFIRMED_ADDRESS = REQUEST_ADDRESS + [
+    ('POST', '/en/request/access-code/select-address/', {'form-pick-address': '10023122451', **SAVE}),
+    ('GET', '/en/request/access-code/confirm-address/', None),
+    ('POST', '/en/request/access-code/confirm-address/', {'form-confirm-address': 'yes', **SAVE}),
+    ('POST', '/en/request/access-code/household/', SAVE),
+]
+
+# the steps walked once by each virtual user, then the step measured
+JOURNEYS = {
+    'start': (
+        [],
+        ('POST', '/en/start/', {'uac': 'w4nwwpphjjptp7fn', **SAVE})
+    ),
+    'select_address': (
+        REQUEST_ADDRESS,
+        ('GET', '/en/request/access-code/select-address/', None)
+    ),
+    'confirm_address': (
+        REQUEST_ADDRESS + [
+            ('POST', '/en/request/access-code/select-address/', {'form-pick-address': '10023122451', **SAVE}),
+        ],
+        ('GET', '/en/request/access-code/confirm-address/', None)
+    ),
+    'fulfilment_sms': (
+        REQUEST_CONFIRMED_ADDRESS + [
+            ('POST', '/en/request/access-code/select-how-to-receive/', {'form-select-method': 'sms', **SAVE}),
+            ('POST', '/en/request/access-code/enter-mobile/', {'request-mobile-number': '07700900345', **SAVE}),
+        ],
+        ('POST', '/en/request/access-code/confirm-send-by-text/', {'request-mobile-confirmation': 'yes', **SAVE})
+    ),
+    'fulfilment_post': (
+        REQUEST_CONFIRMED_ADDRESS + [
+            ('POST', '/en/request/access-code/select-how-to-receive/', {'form-select-method': 'post', **SAVE}),
+            ('POST', '/en/request/access-code/enter-name/',
+             {'name_first_name': 'Bob', 'name_last_name': 'Bobbington', **SAVE}),
+        ],
+        ('POST', '/en/request/access-code/confirm-send-by-post/',
+         {'request-name-address-confirmation': 'yes', **SAVE})
+    ),
+    'launch_eq': (
+        [('POST', '/en/start/', {'uac': 'w4nwwpphjjptp7fn', **SAVE})],
+        ('POST', '/en/start/confirm-address/', {'address-check-answer': 'Yes', **SAVE})
+    ),
+}
+
+
+def percentile(timings, percent):
+    return sorted(timings)[max(int(len(timings) * percent / 100) - 1, 0)]
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def send(client, base_url, method, path, data):
+    async with client.request(method, base_url + path, data=data, allow_redirects=False) as response:
+        await response.read()
+        return response.status
+
+
+async def run(base_url, journey, requests, concurrency):
+    setup, (method, path, data) = JOURNEYS[journey]
+    timings = []
+    errors = 0
+    remaining = requests
+
+    async def user():
+        nonlocal errors, remaining
+        async with ClientSession(cookie_jar=CookieJar(unsafe=True)) as client:
+            for step in setup:
+                status = await send(client, base_url, *step)
+                if status >= 400:
+                    raise RuntimeError(f'{journey}: {step[0]} {step[1]} returned {status}')
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                status = await send(client, base_url, method, path, data)
+                timings.append(time.perf_counter() - started)
+                errors += status >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*[user() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'requests_per_second': round(len(timings) / elapsed),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p90_ms': round(percentile(timings, 90) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3)
+    }
+
+
+async def main(args):
+    redis = FakeRedisServer()
+    redis_port = await redis.start()
+    rhsvc = TestServer(create_rhsvc_app())
+    address_index = TestServer(create_address_index_app())
+    await rhsvc.start_server()
+    await address_index.start_server()
+
+    # TestingConfig leaves session storage to the unit tests, which keep sessions in a cookie
+    for key, value in {
+        'LOG_LEVEL': args.log_level,
+        'EXT_LOG_LEVEL': args.log_level,
+        'REDIS_SERVER': 'localhost',
+        'REDIS_PORT': str(redis_port),
+        'SESSION_AGE': '2700',
+        'RHSVC_URL': str(rhsvc.make_url('')).rstrip('/'),
+        'ADDRESS_INDEX_SVC_URL': str(address_index.make_url('')).rstrip('/'),
+        'FULFILMENT_CATALOGUE_REFRESH': str(args.fulfilment_catalogue_refresh),
+    }.items():
+        setattr(config.TestingConfig, key, value)
+    server = TestServer(create_app('TestingConfig'))
+    await server.start_server()
+    base_url = str(server.make_url('')).rstrip('/')
+
+    results = {}
+    try:
+        for journey in args.journey or JOURNEYS:
+            results[journey] = await run(base_url, journey, args.requests, args.concurrency)
+    finally:
+        await server.close()
+        await rhsvc.close()
+        await address_index.close()
+        await redis.close()
+
+    output = json.dumps({
+        'commit': current_commit(),
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'journeys': results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            fp.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--journey', action='append', choices=list(JOURNEYS),
+                        help='journey to measure, may be repeated, all of them by default')
+    parser.add_argument('--requests', type=int, default=1000, help='requests measured per journey')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--fulfilment-catalogue-refresh', type=int, default=3600,
+                        help='0 looks up every fulfilment from RHSvc, as TestingConfig does')
+    parser.add_argument('--log-level', default='ERROR',
+                        help='INFO as in production, although its logs go to stdout along with the results unless '
+                             'they are written to --output')
+    parser.add_argument('--output', help='file to write the results to, rather than stdout')
+    asyncio.get_event_loop().run_until_complete(main(parser.parse_args()))
@@ -0,0 +1,55 @@
+"""
+Time CSP nonce generation, and requests through the full middleware stack of a TestingConfig app.
+Requests are made to /info, so the stack without templates or upstream services.
+
+    python -m tests.benchmarks.middleware --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import string
+import time
+import timeit
+
+from aiohttp.test_utils import TestClient, TestServer
+from aiohttp_session import session_middleware, SimpleCookieStorage
+
+from app import security, session
+from app.app import create_app
+
+rnd = random.SystemRandom()
+
+
+def choice_random_string(length):
+    # how nonces were generated before, one SystemRandom draw per character
+    allowed_chars = (string.ascii_lowercase + string.ascii_uppercase + string.digits)
+    return ''.join(rnd.choice(allowed_chars) for _ in range(length))
+
+
+def time_nonce(get_random_string, number):
+    return round(min(timeit.repeat(lambda: get_random_string(16), number=number, repeat=3)) / number * 1e6, 3)
+
+
+async def time_requests(path, requests):
+    # as in the unit tests, keep sessions in a cookie rather than Redis
+    session.setup = lambda app_config: session_middleware(SimpleCookieStorage(cookie_name='RH_SESSION'))
+    async with TestClient(TestServer(create_app('TestingConfig'))) as client:
+        started = time.perf_counter()
+        for _ in range(requests):
+            async with client.get(path, allow_redirects=False) as response:
+                await response.read()
+        return round((time.perf_counter() - started) / requests * 1e6)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    loop = asyncio.get_event_loop()
+    print(json.dumps({
+        'nonce_choice_us': time_nonce(choice_random_string, args.number),
+        'nonce_token_urlsafe_us': time_nonce(security.get_random_string, args.number),
+        'info_request_us': loop.run_until_complete(time_requests('/info', args.requests)),
+    }, indent=2))
@@ -0,0 +1,155 @@
+"""
+Time to first byte, total time and worker memory for the select address page of a postcode with thousands of
+addresses, as Address Index can return up to 5000, rendered whole and streamed as it is rendered.
+
+    python -m tests.benchmarks.select_address --addresses 5000 --repeat 20
+
+For each way of rendering, a new process runs a TestingConfig app, with its sessions in a fake Redis and its upstream
+calls made to a stub Address Index answering with that many addresses, so that the page is fetched over a real
+connection and the peak RSS of that process (Linux only) is its own.
+Streamed, the first byte should arrive as soon as the head of the page is rendered, rather than once it all is, and
+peak RSS should grow less with the number of addresses.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from aiohttp import ClientSession, CookieJar
+from aiohttp.test_utils import TestServer
+
+from app import config
+from app.app import create_app
+from tests.benchmarks.journeys import REQUEST_ADDRESS, current_commit, percentile, send
+from tests.stubs.fake_redis import FakeRedisServer
+from tests.stubs.upstream import create_address_index_app, create_rhsvc_app
+
+PAGE = '/en/request/access-code/select-address/'
+
+# SELECT_ADDRESS_STREAM_THRESHOLD for each way of rendering the page
+MODES = {
+    'whole': str(sys.maxsize),
+    'streamed': '0',
+}
+
+
+def postcode_results(app, count):
+    template = app['postcode']['response']['addresses'][0]
+    app['postcode']['response']['addresses'] = [
+        {**template, 'uprn': str(10023200000 + number), 'formattedAddress': f'{number} Long Street, Exeter, EX2 6GA'}
+        for number in range(1, count + 1)
+    ]
+    app['postcode']['response']['total'] = count
+
+
+async def serve(mode, addresses):
+    """
+    Run the app and the stubs it needs, printing its URL, until killed.
+    """
+    redis = FakeRedisServer()
+    redis_port = await redis.start()
+    rhsvc = TestServer(create_rhsvc_app())
+    address_index_app = create_address_index_app()
+    postcode_results(address_index_app, addresses)
+    address_index = TestServer(address_index_app)
+    await rhsvc.start_server()
+    await address_index.start_server()
+
+    for key, value in {
+        'LOG_LEVEL': 'ERROR',
+        'EXT_LOG_LEVEL': 'ERROR',
+        'REDIS_SERVER': 'localhost',
+        'REDIS_PORT': str(redis_port),
+        'SESSION_AGE': '2700',
+        'RHSVC_URL': str(rhsvc.make_url('')).rstrip('/'),
+        'ADDRESS_INDEX_SVC_URL': str(address_index.make_url('')).rstrip('/'),
+        'SELECT_ADDRESS_STREAM_THRESHOLD': MODES[mode],
+    }.items():
+        setattr(config.TestingConfig, key, value)
+    server = TestServer(create_app('TestingConfig'))
+    await server.start_server()
+    print(str(server.make_url('')).rstrip('/'), flush=True)
+    await asyncio.Event().wait()
+
+
+def peak_rss_mb(pid):
+    with open(f'/proc/{pid}/status') as fp:
+        for line in fp:
+            if line.startswith('VmHWM:'):
+                return round(int(line.split()[1]) / 1024, 1)
+
+
+async def measure(base_url, pid, repeat) -> dict:
+    first_byte, total = [], []
+    size = 0
+    async with ClientSession(cookie_jar=CookieJar(unsafe=True)) as client:
+        for step in REQUEST_ADDRESS:
+            status = await send(client, base_url, *step)
+            if status >= 400:
+                raise RuntimeError(f'{step[0]} {step[1]} returned {status}')
+        # the first request fills the Address Index cache, the rest are all rendering
+        await send(client, base_url, 'GET', PAGE, None)
+        rss_before = peak_rss_mb(pid)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            async with client.get(base_url + PAGE) as response:
+                if response.status >= 400:
+                    raise RuntimeError(f'GET {PAGE} returned {response.status}')
+                size = 0
+                async for chunk in response.content.iter_any():
+                    if not size:
+                        first_byte.append(time.perf_counter() - started)
+                    size += len(chunk)
+            total.append(time.perf_counter() - started)
+
+    return {
+        'page_bytes': size,
+        'first_byte_p50_ms': round(percentile(first_byte, 50) * 1000, 1),
+        'first_byte_p90_ms': round(percentile(first_byte, 90) * 1000, 1),
+        'total_p50_ms': round(percentile(total, 50) * 1000, 1),
+        'total_p90_ms': round(percentile(total, 90) * 1000, 1),
+        'peak_rss_before_mb': rss_before,
+        'peak_rss_mb': peak_rss_mb(pid)
+    }
+
+
+async def main(args):
+    results = {}
+    for mode in MODES:
+        process = subprocess.Popen([sys.executable, '-m', 'tests.benchmarks.select_address', '--serve', mode,
+                                    '--addresses', str(args.addresses)], stdout=subprocess.PIPE)
+        try:
+            base_url = process.stdout.readline().decode().strip()
+            if not base_url:
+                raise RuntimeError(f'app for {mode} did not start')
+            results[mode] = await measure(base_url, process.pid, args.repeat)
+        finally:
+            process.kill()
+            process.wait()
+
+    output = json.dumps({
+        'commit': current_commit(),
+        'addresses': args.addresses,
+        'repeat': args.repeat,
+        **results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            fp.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--addresses', type=int, default=5000, help='addresses found for the postcode')
+    parser.add_argument('--repeat', type=int, default=20, help='requests measured for each way of rendering')
+    parser.add_argument('--serve', choices=list(MODES), help='run the app rendering the page this way, until killed')
+    parser.add_argument('--output', help='file to write the results to, rather than stdout')
+    args = parser.parse_args()
+    if args.serve:
+        asyncio.get_event_loop().run_until_complete(serve(args.serve, args.addresses))
+    else:
+        asyncio.get_event_loop().run_until_complete(main(args))
@@ -0,0 +1,96 @@
+"""
+Compare the session store's Redis round trips against a local redis-server.
+
+    python -m tests.benchmarks.session_store --requests 20000 --concurrency 50
+    python -m tests.benchmarks.session_store --unix-socket /tmp/redis.sock
+
+'separate' loads a session with a GET and keeps it alive with a separate SET, as the aioredis 1 store did.
+'pipelined' sends the GET and the EXPIRE that keeps it alive in a single round trip, as RHRedisStorage does.
+Both write the session back for the given fraction of requests that change it.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from aioredis import ConnectionPool, Redis, UnixDomainSocketConnection
+
+SESSION_AGE = 2700
+
+
+def percentile(timings, percent):
+    return sorted(timings)[int(len(timings) * percent / 100) - 1]
+
+
+async def separate(redis, key, changed):
+    data = await redis.get(key)
+    await redis.set(key, data if not changed else json.dumps({'changed': time.time()}), ex=SESSION_AGE)
+
+
+async def pipelined(redis, key, changed):
+    async with redis.pipeline(transaction=False) as pipe:
+        await pipe.get(key).expire(key, SESSION_AGE).execute()
+    if changed:
+        await redis.set(key, json.dumps({'changed': time.time()}), ex=SESSION_AGE)
+
+
+async def run(redis, load, keys, requests, concurrency, changed):
+    timings = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(random.choice(keys))
+
+    async def worker():
+        while not queue.empty():
+            key = queue.get_nowait()
+            started = time.perf_counter()
+            await load(redis, key, random.random() < changed)
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        'requests_per_second': round(requests / elapsed),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'connections': len(redis.connection_pool._available_connections) +
+        len(redis.connection_pool._in_use_connections)
+    }
+
+
+async def main(args):
+    if args.unix_socket:
+        pool = ConnectionPool(connection_class=UnixDomainSocketConnection, path=args.unix_socket,
+                              max_connections=args.pool_max)
+    else:
+        pool = ConnectionPool(host=args.host, port=args.port, max_connections=args.pool_max)
+    redis = Redis(connection_pool=pool)
+
+    keys = [f'RH_SESSION_benchmark_{uuid.uuid4().hex}' for _ in range(args.sessions)]
+    for key in keys:
+        await redis.set(key, json.dumps({'session': {'client_id': key}}), ex=SESSION_AGE)
+
+    results = {}
+    for name, load in (('separate', separate), ('pipelined', pipelined)):
+        results[name] = await run(redis, load, keys, args.requests, args.concurrency, args.changed)
+
+    await redis.delete(*keys)
+    await redis.close()
+    await pool.disconnect()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--unix-socket')
+    parser.add_argument('--pool-max', type=int, default=500)
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--changed', type=float, default=0.3, help='fraction of requests that change the session')
+    asyncio.get_event_loop().run_until_complete(main(parser.parse_args()))
@@ -0,0 +1,189 @@
+"""
+Load test a running Respondent Home by replaying complete respondent journeys, each virtual user walking one journey
+after another as a new respondent with its own cookies, following redirects as a browser would.
+
+    python -m tests.stubs &
+    APP_SETTINGS=DevelopmentConfig inv server --port 9092 --workers 4 --no-production --no-reload
+    python -m tests.load.journeys --url http://localhost:9092 --users 50 --duration 60 --output load.json
+
+Run it against gunicorn with different worker counts and REDIS_POOL_MAX settings to size them: the results give
+journeys and requests per second, latency percentiles per request, and the app's /info?stats at the end of the run,
+including the number of connections the Redis pool grew to. With more than one worker, /info is answered by whichever
+worker gets it.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from collections import Counter, defaultdict
+
+from aiohttp import ClientError, ClientSession, CookieJar
+from yarl import URL
+
+from tests.benchmarks.journeys import current_commit, percentile
+
+SAVE = {'action[save_continue]': ''}
+
+# the form posts and first page of each journey, the pages in between are reached by following redirects
+JOURNEYS = {
+    'eq_launch': [
+        ('GET', '/en/start/', None),
+        ('POST', '/en/start/', {'uac': 'W4NWWPPHJJPTP7FN', **SAVE}),
+        ('POST', '/en/start/confirm-address/', {'address-check-answer': 'Yes', **SAVE}),
+    ],
+    'ni_paper_questionnaire_12_people': [
+        ('GET', '/ni/request/paper-questionnaire/enter-address/', None),
+        ('POST', '/ni/request/paper-questionnaire/enter-address/', {'form-enter-address-postcode': 'EX2 6GA', **SAVE}),
+        ('POST', '/ni/request/paper-questionnaire/select-address/', {'form-pick-address': '10023122453', **SAVE}),
+        ('POST', '/ni/request/paper-questionnaire/confirm-address/', {'form-confirm-address': 'yes', **SAVE}),
+        ('POST', '/ni/request/paper-questionnaire/household/', SAVE),
+        ('POST', '/ni/request/paper-questionnaire/number-of-people-in-your-household/',
+         {'number_of_people': '12', **SAVE}),
+        ('POST', '/ni/request/paper-questionnaire/enter-name/',
+         {'name_first_name': 'Bob', 'name_last_name': 'Bobbington', **SAVE}),
+        ('POST', '/ni/request/paper-questionnaire/confirm-send-by-post/',
+         {'request-name-address-confirmation': 'yes', **SAVE}),
+    ],
+    'link_address': [
+        ('GET', '/en/start/', None),
+        ('POST', '/en/start/', {'uac': 'UNL1NKED00000001', **SAVE}),
+        ('POST', '/en/start/link-address/enter-address/', {'form-enter-address-postcode': 'EX2 6GA', **SAVE}),
+        ('POST', '/en/start/link-address/select-address/', {'form-pick-address': '10023122451', **SAVE}),
+        ('POST', '/en/start/link-address/confirm-address/', {'form-confirm-address': 'yes', **SAVE}),
+    ],
+}
+
+
+class JourneyFailed(Exception):
+    pass
+
+
+class LoadStats:
+
+    def __init__(self):
+        self.requests = defaultdict(list)
+        self.journeys = defaultdict(list)
+        self.failures = defaultdict(Counter)
+
+    @staticmethod
+    def summarise(timings, elapsed) -> dict:
+        if not timings:
+            return {'count': 0}
+        return {
+            'count': len(timings),
+            'per_second': round(len(timings) / elapsed, 1),
+            'p50_ms': round(percentile(timings, 50) * 1000, 1),
+            'p90_ms': round(percentile(timings, 90) * 1000, 1),
+            'p99_ms': round(percentile(timings, 99) * 1000, 1),
+            'max_ms': round(max(timings) * 1000, 1)
+        }
+
+    def results(self, elapsed) -> dict:
+        return {
+            'journeys': {
+                name: {**self.summarise(self.journeys[name], elapsed), 'failures': dict(self.failures[name])}
+                for name in sorted(set(self.journeys) | set(self.failures))
+            },
+            'requests': {name: self.summarise(timings, elapsed) for name, timings in sorted(self.requests.items())}
+        }
+
+
+class VirtualUser:
+
+    def __init__(self, base_url, stats, think_time):
+        self.base_url = URL(base_url)
+        self.stats = stats
+        self.think_time = think_time
+
+    async def request(self, client, method, url, data=None):
+        started = time.perf_counter()
+        try:
+            async with client.request(method, url, data=data, allow_redirects=False) as response:
+                await response.read()
+        except (ClientError, asyncio.TimeoutError) as ex:
+            raise JourneyFailed(f'{method} {url.path} {type(ex).__name__}')
+        self.stats.requests[f'{method} {url.path}'].append(time.perf_counter() - started)
+        if response.status >= 400:
+            raise JourneyFailed(f'{method} {url.path} {response.status}')
+        return response
+
+    async def walk(self, steps):
+        async with ClientSession(cookie_jar=CookieJar(unsafe=True)) as client:
+            for method, path, data in steps:
+                url = self.base_url.join(URL(path))
+                response = await self.request(client, method, url, data)
+                # follow redirects within the site, a redirect elsewhere (to EQ) ends the journey
+                while response.status in (301, 302, 303) and 'Location' in response.headers:
+                    location = url.join(URL(response.headers['Location']))
+                    if location.origin() != self.base_url.origin():
+                        return
+                    if method == 'POST' and location.path == url.path:
+                        raise JourneyFailed(f'POST {url.path} rejected')
+                    method, url = 'GET', location
+                    response = await self.request(client, method, url)
+                if self.think_time:
+                    await asyncio.sleep(self.think_time)
+
+    async def run(self, journeys, until):
+        index = 0
+        while time.monotonic() < until:
+            name = journeys[index % len(journeys)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                await self.walk(JOURNEYS[name])
+            except JourneyFailed as ex:
+                self.stats.failures[name][str(ex)] += 1
+            else:
+                self.stats.journeys[name].append(time.perf_counter() - started)
+
+
+async def app_stats(base_url):
+    try:
+        async with ClientSession() as client:
+            async with client.get(f'{base_url}/info?stats') as response:
+                return (await response.json())['stats']
+    except (ClientError, ValueError, KeyError) as ex:
+        return {'error': repr(ex)}
+
+
+async def main(args):
+    journeys = args.journey or list(JOURNEYS)
+    stats = LoadStats()
+    started = time.monotonic()
+    until = started + args.ramp_up + args.duration
+
+    async def user(number):
+        await asyncio.sleep(args.ramp_up * number / args.users)
+        # start users at different points in the journey mix
+        offset = number % len(journeys)
+        await VirtualUser(args.url, stats, args.think_time).run(journeys[offset:] + journeys[:offset], until)
+
+    await asyncio.gather(*[user(number) for number in range(args.users)])
+    output = json.dumps({
+        'commit': current_commit(),
+        'url': args.url,
+        'users': args.users,
+        'duration': args.duration,
+        **stats.results(time.monotonic() - started),
+        'app_stats': await app_stats(args.url)
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            fp.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:9092')
+    parser.add_argument('--journey', action='append', choices=list(JOURNEYS),
+                        help='journey to replay, may be repeated, all of them in turn by default')
+    parser.add_argument('--users', type=int, default=20, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=60, help='seconds to run for once all users have started')
+    parser.add_argument('--ramp-up', type=float, default=0, help='seconds over which to start the users')
+    parser.add_argument('--think-time', type=float, default=0, help='seconds each user waits after each form')
+    parser.add_argument('--output', help='file to write the results to, rather than stdout')
+    asyncio.get_event_loop().run_until_complete(main(parser.parse_args()))
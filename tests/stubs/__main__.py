@@ -0,0 +1,117 @@
+"""
+Run the stub RHSvc, Address Index and AD Lookup servers and the fake Redis, by default on the ports and paths
+DevelopmentConfig expects, so that the app can be run locally without any of the real services.
+
+    python -m tests.stubs
+    APP_SETTINGS=DevelopmentConfig inv server --port 9092 --no-production --no-reload
+
+Each service can be made to misbehave, for a service named rhsvc, address_index or ad_lookup, or all of them:
+
+    python -m tests.stubs --latency all=lognormal:30:0.7 --error-rate rhsvc=0.05:503 --drop-rate rhsvc=0.02
+
+Latency is one of fixed:MS, uniform:MIN_MS:MAX_MS, exponential:MEAN_MS or lognormal:MEDIAN_MS:SIGMA.
+Error rates answer with 503 or 429 unless the statuses are given. The counts of faults injected are in each stub's /info.
+"""
+import argparse
+import asyncio
+import random
+
+from collections import defaultdict
+
+from aiohttp import web
+
+from .fake_redis import FakeRedisServer
+from .faults import Faults, parse_latency
+from .upstream import create_ad_lookup_app, create_address_index_app, create_rhsvc_app
+
+SERVICES = ('rhsvc', 'address_index', 'ad_lookup')
+
+
+def service_option(parse):
+    def parse_option(option):
+        service, _, value = option.partition('=')
+        if service not in SERVICES + ('all',) or not value:
+            raise argparse.ArgumentTypeError(f"expected SERVICE=VALUE, where SERVICE is one of {', '.join(SERVICES)} "
+                                             f"or all")
+        try:
+            return service, parse(value)
+        except ValueError as ex:
+            raise argparse.ArgumentTypeError(str(ex))
+    return parse_option
+
+
+def check_latency(value):
+    parse_latency(value)
+    return value
+
+
+def parse_error_rate(value):
+    rate, _, statuses = value.partition(':')
+    return float(rate), tuple(int(status) for status in statuses.split(',')) if statuses else (503, 429)
+
+
+def make_faults(args) -> dict:
+    options = defaultdict(dict)
+    for name, values in (('latency', args.latency), ('error_rate', args.error_rate), ('drop_rate', args.drop_rate)):
+        # options for all services first, so those for a particular service override them
+        for service, value in sorted(values, key=lambda option: option[0] != 'all'):
+            for target in SERVICES if service == 'all' else (service,):
+                if name == 'error_rate':
+                    options[target]['error_rate'], options[target]['error_statuses'] = value
+                else:
+                    options[target][name] = value
+    return {service: Faults(**options[service]) for service in SERVICES}
+
+
+async def start_app(app, host, port):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def main(args):
+    faults = make_faults(args)
+    rhsvc = create_rhsvc_app(faults['rhsvc'])
+    ad_lookup = create_ad_lookup_app(faults['ad_lookup'])
+    if args.ad_lookup_port == args.rhsvc_port:
+        rhsvc.add_subapp('/v1', ad_lookup)
+        apps = [(rhsvc, args.rhsvc_port)]
+    else:
+        apps = [(rhsvc, args.rhsvc_port), (ad_lookup, args.ad_lookup_port)]
+    apps.append((create_address_index_app(faults['address_index']), args.address_index_port))
+    runners = [await start_app(app, args.host, port) for app, port in apps]
+    redis = FakeRedisServer()
+    await redis.start(args.host, args.redis_port)
+    print(f'RHSvc on {args.rhsvc_port}, Address Index on {args.address_index_port}, '
+          f"AD Lookup on {args.ad_lookup_port}{'/v1' if args.ad_lookup_port == args.rhsvc_port else ''}, "
+          f'Redis on {args.redis_port}')
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await redis.close()
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--rhsvc-port', type=int, default=8071)
+    parser.add_argument('--address-index-port', type=int, default=9000)
+    parser.add_argument('--ad-lookup-port', type=int, default=8071,
+                        help='served under /v1 when the same as the RHSvc port')
+    parser.add_argument('--redis-port', type=int, default=7379)
+    parser.add_argument('--latency', action='append', default=[], metavar='SERVICE=DISTRIBUTION',
+                        type=service_option(check_latency))
+    parser.add_argument('--error-rate', action='append', default=[], metavar='SERVICE=RATE[:STATUS,...]',
+                        type=service_option(parse_error_rate))
+    parser.add_argument('--drop-rate', action='append', default=[], metavar='SERVICE=RATE',
+                        type=service_option(float))
+    parser.add_argument('--seed', type=int, help='seed the faults, to repeat a run')
+    args = parser.parse_args()
+    random.seed(args.seed)
+    try:
+        asyncio.get_event_loop().run_until_complete(main(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,76 @@
+"""
+A Redis stand-in speaking enough of the RESP protocol for session storage: PING, GET, SET with EX, EXPIRE and DEL.
+Values are kept in memory, keys expiring as they would in Redis.
+"""
+import asyncio
+import time
+
+
+class FakeRedisServer:
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.commands = 0
+        self._server = None
+
+    async def start(self, host='localhost', port=0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _expire(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            del self.expires[key]
+            self.data.pop(key, None)
+
+    def execute(self, command, *args) -> bytes:
+        self.commands += 1
+        command = command.upper()
+        if command == b'PING':
+            return b'+PONG\r\n'
+        if command == b'GET':
+            self._expire(args[0])
+            value = self.data.get(args[0])
+            return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+        if command == b'SET':
+            key, value, *options = args
+            self.data[key] = value
+            self.expires.pop(key, None)
+            if len(options) == 2 and options[0].upper() == b'EX':
+                self.expires[key] = time.monotonic() + int(options[1])
+            return b'+OK\r\n'
+        if command == b'EXPIRE':
+            self._expire(args[0])
+            if args[0] not in self.data:
+                return b':0\r\n'
+            self.expires[args[0]] = time.monotonic() + int(args[1])
+            return b':1\r\n'
+        if command == b'DEL':
+            deleted = 0
+            for key in args:
+                self._expire(key)
+                deleted += self.data.pop(key, None) is not None
+                self.expires.pop(key, None)
+            return b':%d\r\n' % deleted
+        return b"-ERR unknown command '%s'\r\n" % command
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self.execute(*args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
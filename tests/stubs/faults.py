@@ -0,0 +1,79 @@
+"""
+Upstream misbehaviour for the stub servers: latency drawn from a distribution, error responses and dropped connections.
+"""
+import asyncio
+import random
+
+from collections import Counter
+
+from aiohttp import web
+
+# name: (parameters, function returning a delay in ms from them)
+DISTRIBUTIONS = {
+    'fixed': (('ms',), lambda ms: ms),
+    'uniform': (('min_ms', 'max_ms'), random.uniform),
+    'exponential': (('mean_ms',), lambda mean_ms: random.expovariate(1 / mean_ms)),
+    'lognormal': (('median_ms', 'sigma'), lambda median_ms, sigma: median_ms * random.lognormvariate(0, sigma)),
+}
+
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution such as 'fixed:20', 'uniform:10:50', 'exponential:30' or 'lognormal:25:0.8',
+    returning a function that draws a delay in seconds from it.
+    """
+    name, *args = spec.split(':')
+    try:
+        parameters, draw = DISTRIBUTIONS[name]
+    except KeyError:
+        raise ValueError(f"unknown latency distribution {name}, expected one of {', '.join(DISTRIBUTIONS)}")
+    if len(args) != len(parameters):
+        raise ValueError(f"{name} latency takes {':'.join(parameters)}")
+    args = [float(arg) for arg in args]
+    return lambda: max(draw(*args), 0) / 1000
+
+
+class Faults:
+    """
+    How a stub server misbehaves. Each request is delayed by latency, then answered with one of error_statuses with
+    probability error_rate, or has its connection dropped without a response with probability drop_rate.
+    429 responses carry a Retry-After header of retry_after seconds.
+    """
+    def __init__(self, latency=None, error_rate=0.0, error_statuses=(503, 429), drop_rate=0.0, retry_after=1):
+        self.latency = parse_latency(latency) if latency else None
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.drop_rate = drop_rate
+        self.retry_after = retry_after
+        self.counts = Counter()
+
+    async def apply(self, request, handler):
+        self.counts['requests'] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency())
+        chance = random.random()
+        if chance < self.drop_rate:
+            self.counts['dropped'] += 1
+            request.transport.close()
+            raise asyncio.CancelledError()
+        if chance < self.drop_rate + self.error_rate:
+            status = random.choice(self.error_statuses)
+            self.counts[str(status)] += 1
+            headers = {'Retry-After': str(self.retry_after)} if status == 429 else None
+            return web.json_response({'error': 'injected fault'}, status=status, headers=headers)
+        return await handler(request)
+
+    def stats(self) -> dict:
+        return dict(self.counts)
+
+
+@web.middleware
+async def fault_middleware(request, handler):
+    """
+    Apply the faults of the app routing the request. Where a stub is mounted within another, as AD Lookup can be within
+    RHSvc, only its own faults are applied. Health checks at /info are left alone.
+    """
+    app = request.match_info.current_app
+    if app is not request.match_info.apps[-1] or request.path.endswith('/info'):
+        return await handler(request)
+    return await app['faults'].apply(request, handler)
@@ -0,0 +1,143 @@
+"""
+Stand-ins for RHSvc, Address Index (AIMS) and AD Lookup, serving the fixtures in tests/test_data rather than mocking
+them with aioresponses, so that the app can be run against them over real connections, see faults for making them
+misbehave.
+"""
+import glob
+import hashlib
+import json
+
+from aiohttp import web
+
+from app.fulfilments import FulfilmentCatalogue
+
+from .faults import Faults, fault_middleware
+
+DATA_DIR = 'tests/test_data'
+
+# access codes answered with a particular UAC fixture, any other valid access code gets uac_e
+UACS = {
+    'UNL1NKED00000001': 'rhsvc/uac_unlinked_e',
+}
+
+# UPRNs from address_index/postcode_results answered with a particular case fixture, any other gets case_by_uprn_hh_e
+CASES = {
+    '10023122452': 'rhsvc/case_by_uprn_hh_w',
+    '10023122453': 'rhsvc/case_by_uprn_hh_n',
+}
+
+
+def load_fixture(name):
+    with open(f'{DATA_DIR}/{name}.json') as fp:
+        return json.load(fp)
+
+
+async def info(request):
+    return web.json_response({'name': request.app['name'], 'status': 'UP', 'faults': request.app['faults'].stats()})
+
+
+def create_stub_app(name, routes, faults) -> web.Application:
+    app = web.Application(middlewares=[fault_middleware])
+    app['name'] = name
+    app['faults'] = faults or Faults()
+    app.add_routes(routes)
+    return app
+
+
+rhsvc_routes = web.RouteTableDef()
+rhsvc_routes.get('/info')(info)
+
+
+@rhsvc_routes.get('/uacs/{uac_hash}')
+async def get_uac(request):
+    return web.json_response(request.app['uacs'].get(request.match_info['uac_hash'], request.app['uac']))
+
+
+@rhsvc_routes.post('/uacs/{uac_hash}/link')
+async def link_uac(request):
+    return web.json_response(request.app['linked_uac'])
+
+
+@rhsvc_routes.get('/cases/uprn/{uprn}')
+async def get_case_by_uprn(request):
+    uprn = request.match_info['uprn']
+    return web.json_response({**request.app['cases'].get(uprn, request.app['case']), 'uprn': uprn})
+
+
+@rhsvc_routes.post('/cases/create')
+async def create_case(request):
+    return web.json_response(request.app['linked_uac'])
+
+
+@rhsvc_routes.get('/fulfilments')
+async def get_fulfilments(request):
+    query = request.query
+    products = request.app['fulfilments'].find(query.get('caseType'), query.get('region'),
+                                               query.get('deliveryChannel'), query.get('productGroup'),
+                                               query.get('individual'))
+    return web.json_response(products or [])
+
+
+@rhsvc_routes.post(r'/cases/{case_id}/fulfilments/{channel:(sms|post)}')
+async def request_fulfilment(request):
+    await request.json()
+    return web.json_response(load_fixture(f"rhsvc/request_fulfilment_{request.match_info['channel']}"))
+
+
+@rhsvc_routes.post('/surveyLaunched')
+async def survey_launched(request):
+    await request.json()
+    return web.Response()
+
+
+def create_rhsvc_app(faults=None) -> web.Application:
+    app = create_stub_app('rhsvc-stub', rhsvc_routes, faults)
+    app['uac'] = load_fixture('rhsvc/uac_e')
+    app['uacs'] = {
+        hashlib.sha256(access_code.encode('utf-8')).hexdigest(): load_fixture(name) for access_code, name in UACS.items()
+    }
+    app['linked_uac'] = load_fixture('rhsvc/uac_linked_e')
+    app['case'] = load_fixture('rhsvc/case_by_uprn_hh_e')
+    app['cases'] = {uprn: load_fixture(name) for uprn, name in CASES.items()}
+    app['fulfilments'] = FulfilmentCatalogue(0)
+    app['fulfilments'].products = []
+    for path in sorted(glob.glob(f'{DATA_DIR}/rhsvc/get_fulfilment_*.json')):
+        with open(path) as fp:
+            app['fulfilments'].products.extend(json.load(fp))
+    return app
+
+
+address_index_routes = web.RouteTableDef()
+address_index_routes.get('/info')(info)
+
+
+@address_index_routes.get('/addresses/rh/postcode/{postcode}')
+async def get_postcode(request):
+    return web.json_response(request.app['postcode'])
+
+
+@address_index_routes.get('/addresses/rh/uprn/{uprn}')
+async def get_uprn(request):
+    return web.json_response(request.app['uprn'])
+
+
+def create_address_index_app(faults=None) -> web.Application:
+    app = create_stub_app('address-index-stub', address_index_routes, faults)
+    app['postcode'] = load_fixture('address_index/postcode_results')
+    app['uprn'] = load_fixture('address_index/uprn_valid_hh')
+    return app
+
+
+ad_lookup_routes = web.RouteTableDef()
+ad_lookup_routes.get('/info')(info)
+
+
+@ad_lookup_routes.get('/centres/postcode')
+async def get_centres(request):
+    return web.json_response(request.app['centres'])
+
+
+def create_ad_lookup_app(faults=None) -> web.Application:
+    app = create_stub_app('ad-lookup-stub', ad_lookup_routes, faults)
+    app['centres'] = load_fixture('ad_lookup/multiple_return')
+    return app
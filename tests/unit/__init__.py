@@ -4,12 +4,13 @@ import json
 import time
 import uuid
 
-from aiohttp.test_utils import AioHTTPTestCase
+from aiohttp.test_utils import AioHTTPTestCase, make_mocked_request
 from tenacity import wait_exponential
 
 from app import app
 
 from app import session, request
+from app.circuit_breaker import CircuitBreaker
 from aiohttp_session import session_middleware
 from aiohttp_session import SimpleCookieStorage
 
@@ -169,6 +170,26 @@ class RHTestCase(AioHTTPTestCase):
         if hasattr(test_method, 'tearDown'):
             await test_method.tearDown(self)
 
+    def make_request(self, deadline=None):
+        """
+        A request to pass to the upstream service calls made outside a handler, due deadline seconds from now if given.
+        """
+        mocked_request = make_mocked_request('GET', '/', app=self.app)
+        mocked_request['client_ip'] = None
+        mocked_request['client_id'] = '36be6b97-b4de-4718-8a74-8b27fb03ca8c'
+        mocked_request['trace'] = None
+        if deadline is not None:
+            mocked_request['deadline'] = time.monotonic() + deadline
+        return mocked_request
+
+    def reset_circuits(self):
+        """
+        Close every upstream circuit breaker, for tests that make more failing requests to a service than it takes to
+        open its circuit.
+        """
+        for client in self.app.http_clients.clients:
+            client.breaker = CircuitBreaker(client.name, client.breaker.failure_threshold, client.breaker.reset_timeout)
+
     def assertLogJson(self, watcher, event, **kwargs):
         """
         Helper method for asserting the contents of structlog records caught by self.assertLogs.
@@ -776,6 +776,34 @@ class TestHelpers(RHTestCase):
                 self.assertIn(self.build_translation_link('select-address', display_region), contents)
             self.check_text_select_address(display_region, contents, check_error=True)
 
+    async def check_select_address_streamed(self, get_url, post_url, display_region):
+        self.app['SELECT_ADDRESS_STREAM_THRESHOLD'] = '0'
+        with self.assertLogs('respondent-home', 'INFO') as cm, \
+                mock.patch('app.utils.AddressIndex.get_ai_postcode') as mocked_get_ai_postcode:
+            mocked_get_ai_postcode.return_value = self.ai_postcode_results
+
+            response = await self.client.request('POST', post_url, data=self.common_form_data_empty)
+
+            self.assertLogEvent(cm, 'no address selected')
+            self.assertLogEvent(cm, self.build_url_log_entry('select-address', display_region, 'GET'))
+
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.headers['Transfer-Encoding'], 'chunked')
+            # the session is saved into the streamed response, with the flashed message it is showing removed
+            saved_session = json.loads(response.cookies['RH_SESSION'].value)['session']
+            self.assertNotIn('flash', saved_session)
+            self.assertEqual(saved_session['attributes']['postcode'], self.postcode_valid)
+            contents = str(await response.content.read())
+            self.assertIn(self.get_logo(display_region), contents)
+            self.check_text_select_address(display_region, contents, check_error=True)
+
+            response = await self.client.request('GET', get_url)
+
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.headers['Transfer-Encoding'], 'chunked')
+            contents = str(await response.content.read())
+            self.check_text_select_address(display_region, contents, check_error=False)
+
     async def check_post_select_address(self, url, display_region, address_type, region, ce_type=None):
         with self.assertLogs('respondent-home', 'INFO') as cm, \
                 mock.patch('app.utils.AddressIndex.get_ai_postcode') as mocked_get_ai_postcode, mock.patch(
@@ -1773,6 +1801,7 @@ class TestHelpers(RHTestCase):
                        status=503)
 
     async def check_post_enter_address_error_503_from_ai(self, url, display_region):
+        self.reset_circuits()
         with self.assertLogs('respondent-home', 'INFO') as cm, \
                 aioresponses(passthrough=[str(self.server._root)]) as mocked:
             self.mock_ai_503s(mocked, attempts_retry_limit)
@@ -1786,6 +1815,7 @@ class TestHelpers(RHTestCase):
             self.check_text_error_500(display_region, contents)
 
     async def check_post_enter_address_connection_error_from_ai(self, url, display_region, epoch=None):
+        self.reset_circuits()
         with self.assertLogs('respondent-home', 'WARN') as cm, \
                 aioresponses(passthrough=[str(self.server._root)]) as mocked:
 
@@ -2,7 +2,8 @@ from importlib import reload
 
 from unittest import TestCase, mock
 
-from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, make_mocked_request, unittest_run_loop
 from aiohttp.web_app import Application
 from aiohttp_session import session_middleware
 from aiohttp_session import SimpleCookieStorage
@@ -12,6 +13,7 @@ from envparse import ConfigurationError, env
 
 from app.app import create_app
 
+from app import security
 from app import session
 
 
@@ -84,6 +86,24 @@ class TestCreateApp(AioHTTPTestCase):
             response.headers['X-Content-Security-Policy'])
         self.assertEqual(response.headers['Referrer-Policy'], 'strict-origin-when-cross-origin')
 
+    @unittest_run_loop
+    async def test_security_headers_without_nonce(self):
+        response = await self.client.request('GET', '/info')
+        for header, value in security.DEFAULT_RESPONSE_HEADERS.items():
+            self.assertEqual(response.headers[header], security._render_header(value))
+        self.assertNotIn('nonce-', response.headers['Content-Security-Policy'])
+
+    @unittest_run_loop
+    async def test_security_headers_with_nonce(self):
+        request = make_mocked_request('GET', '/', app=self.app)
+        response = web.Response(content_type='text/html')
+        await security.on_prepare(request, response)
+        nonce = security.get_nonce(request)
+        self.assertEqual(len(nonce), 16)
+        for header, value in security.DEFAULT_RESPONSE_HEADERS.items():
+            self.assertEqual(response.headers[header], security._render_header(value, nonce))
+        self.assertIn(f"'nonce-{nonce}'", response.headers['Content-Security-Policy'])
+
 
 class TestCreateAppURLPathPrefix(TestCase):
     config = 'TestingConfig'
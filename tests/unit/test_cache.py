@@ -0,0 +1,99 @@
+from unittest import TestCase, mock
+
+from aiohttp.client_exceptions import ClientResponseError
+from aiohttp.test_utils import unittest_run_loop
+from aioresponses import aioresponses
+
+from app.cache import TTLCache
+from app.utils import AddressIndex
+
+from . import RHTestCase
+
+
+class TestTTLCache(TestCase):
+
+    def test_get_missing(self):
+        cache = TTLCache(10, 60)
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 0)
+
+    def test_set_and_get(self):
+        cache = TTLCache(10, 60)
+        cache.set('key', {'value': 1})
+        self.assertEqual(cache.get('key'), {'value': 1})
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_expired_entry(self):
+        cache = TTLCache(10, 60)
+        with mock.patch('app.cache.time.monotonic') as mocked_monotonic:
+            mocked_monotonic.return_value = 1000
+            cache.set('key', 'value')
+            mocked_monotonic.return_value = 1061
+            self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(2, 60)
+        cache.set('first', 1)
+        cache.set('second', 2)
+        cache.get('first')
+        cache.set('third', 3)
+        self.assertEqual(cache.get('first'), 1)
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(cache.get('third'), 3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_disabled(self):
+        cache = TTLCache(0, 60)
+        cache.set('key', 'value')
+        self.assertIsNone(cache.get('key'))
+
+    def test_stats(self):
+        cache = TTLCache(5, 30)
+        cache.set('key', 'value')
+        cache.get('key')
+        cache.get('other')
+        self.assertEqual(cache.stats(), {'size': 1, 'maxsize': 5, 'ttl': 30, 'hits': 1, 'misses': 1, 'evictions': 0})
+
+
+class TestAddressIndexPostcodeCache(RHTestCase):
+
+    @unittest_run_loop
+    async def test_get_ai_postcode_cached(self):
+        request = self.make_request()
+        url = f'{self.addressindexsvc_url}{self.postcode_valid}?limit={self.aims_postcode_limit}&epoch='
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, payload=self.ai_postcode_results.result())
+            first = await AddressIndex.get_ai_postcode(request, self.postcode_valid)
+            second = await AddressIndex.get_ai_postcode(request, self.postcode_valid)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(mocked.requests), 1)
+        self.assertEqual(self.app.postcode_cache.hits, 1)
+        self.assertEqual(self.app.postcode_cache.misses, 1)
+
+    @unittest_run_loop
+    async def test_get_ai_postcode_cache_keyed_on_epoch(self):
+        request = self.make_request()
+        url = f'{self.addressindexsvc_url}{self.postcode_valid}?limit={self.aims_postcode_limit}&epoch='
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, payload=self.ai_postcode_results.result())
+            await AddressIndex.get_ai_postcode(request, self.postcode_valid)
+
+        self.assertIsNotNone(self.app.postcode_cache.get((self.postcode_valid, self.app['ADDRESS_INDEX_EPOCH'])))
+        self.assertIsNone(self.app.postcode_cache.get((self.postcode_valid, '73')))
+
+    @unittest_run_loop
+    async def test_get_ai_postcode_error_not_cached(self):
+        request = self.make_request()
+        url = f'{self.addressindexsvc_url}{self.postcode_valid}?limit={self.aims_postcode_limit}&epoch='
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, status=500)
+            with self.assertLogs('respondent-home', 'ERROR'):
+                with self.assertRaises(ClientResponseError):
+                    await AddressIndex.get_ai_postcode(request, self.postcode_valid)
+
+        self.assertEqual(len(self.app.postcode_cache), 0)
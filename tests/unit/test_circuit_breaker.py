@@ -0,0 +1,105 @@
+import asyncio
+
+from unittest import TestCase
+
+from aiohttp.client_exceptions import ClientConnectionError, ClientResponseError
+from aiohttp.test_utils import unittest_run_loop
+from aioresponses import aioresponses
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.exceptions import CircuitOpenError
+
+from . import RHTestCase
+
+
+def response_error(status):
+    return ClientResponseError(None, (), status=status)
+
+
+class TestCircuitBreaker(TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker('rhsvc', failure_threshold=2, reset_timeout=30)
+
+    def record_failure(self, ex):
+        with self.assertRaises(type(ex)):
+            with self.breaker.guard():
+                raise ex
+
+    def elapse_reset_timeout(self):
+        self.breaker.opened_at -= self.breaker.reset_timeout
+
+    def test_opens_after_consecutive_failures(self):
+        self.record_failure(ClientConnectionError('Failed'))
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.record_failure(asyncio.TimeoutError())
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            with self.breaker.guard():
+                self.fail('request made while open')
+        self.assertEqual(self.breaker.stats(), {'state': OPEN, 'failures': 2, 'opened': 1, 'rejected': 1})
+
+    def test_success_resets_failures(self):
+        self.record_failure(response_error(503))
+        with self.breaker.guard():
+            pass
+        self.record_failure(response_error(504))
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_other_errors_are_not_failures(self):
+        for status in (400, 404, 429, 500):
+            self.record_failure(response_error(status))
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_half_open_lets_one_trial_through(self):
+        self.record_failure(response_error(503))
+        self.record_failure(response_error(503))
+        self.elapse_reset_timeout()
+        with self.breaker.guard():
+            self.assertEqual(self.breaker.state, HALF_OPEN)
+            with self.assertRaises(CircuitOpenError):
+                with self.breaker.guard():
+                    pass
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_failure_reopens(self):
+        self.record_failure(response_error(503))
+        self.record_failure(response_error(503))
+        self.elapse_reset_timeout()
+        self.record_failure(ClientConnectionError('Failed'))
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.opened, 2)
+
+    def test_cancelled_trial_lets_another_through(self):
+        self.record_failure(response_error(503))
+        self.record_failure(response_error(503))
+        self.elapse_reset_timeout()
+        self.record_failure(asyncio.CancelledError())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.breaker.guard():
+            pass
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+class TestCircuitBreakerRequests(RHTestCase):
+
+    @unittest_run_loop
+    async def test_open_circuit_fails_fast_to_error_page(self):
+        breaker = self.app.http_clients.client_for(self.rhsvc_url).breaker
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            for _ in range(breaker.failure_threshold):
+                for _ in range(5):
+                    mocked.get(self.rhsvc_url, exception=ClientConnectionError('Failed'))
+                response = await self.client.request('POST', self.post_start_en, data=self.start_data_valid)
+                self.assertEqual(response.status, 500)
+            self.assertEqual(breaker.state, OPEN)
+            requests_made = sum(len(calls) for calls in mocked.requests.values())
+
+            with self.assertLogs('respondent-home', 'ERROR') as cm:
+                response = await self.client.request('POST', self.post_start_en, data=self.start_data_valid)
+            self.assertLogEvent(cm, 'service connection error', exception='circuit breaker open for rhsvc')
+            self.assertEqual(sum(len(calls) for calls in mocked.requests.values()), requests_made)
+
+        self.assertEqual(response.status, 500)
+        self.assertIn(self.content_common_500_error_en, str(await response.content.read()))
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from aiohttp.client_exceptions import ClientResponseError
+from aiohttp.test_utils import unittest_run_loop
+from aioresponses import CallbackResult, aioresponses
+
+from app.exceptions import DeadlineExceeded
+from app.request import RetryRequest
+from app.request_handlers import RequestCommonConfirmSendByPost
+from app.start_handlers import Start
+from app.utils import RHService
+
+from . import RHTestCase
+
+
+class TestDeadline(RHTestCase):
+
+    def test_route_deadlines(self):
+        self.assertEqual(self.app.route_deadlines[RequestCommonConfirmSendByPost], 20)
+
+    def test_timeout_cut_short(self):
+        retry_request = RetryRequest(self.make_request(deadline=2), 'GET', self.rhsvc_url, None, None, None, True)
+        timeout = retry_request.timeout(retry_request.upstream)
+        self.assertLessEqual(timeout.total, 2)
+        self.assertEqual(timeout.connect, retry_request.upstream.timeout.connect)
+
+    @unittest_run_loop
+    async def test_no_request_after_deadline(self):
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            with self.assertRaises(DeadlineExceeded):
+                await RHService.get_case_by_uprn(self.make_request(deadline=0), self.uprn)
+            self.assertEqual(len(mocked.requests), 0)
+
+    @unittest_run_loop
+    async def test_no_retry_after_deadline(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        request = self.make_request(deadline=10)
+
+        def deadline_passes(url, **kwargs):
+            request['deadline'] = time.monotonic()
+            return CallbackResult(status=503, reason='Service Unavailable')
+
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, callback=deadline_passes)
+            mocked.get(url, payload=self.rhsvc_case_by_uprn_hh_e.result())
+            with self.assertRaises(ClientResponseError):
+                await RHService.get_case_by_uprn(request, self.uprn)
+            self.assertEqual(sum(len(calls) for calls in mocked.requests.values()), 1)
+
+    @unittest_run_loop
+    async def test_timeout_at_deadline(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        request = self.make_request(deadline=10)
+
+        def times_out(url, **kwargs):
+            request['deadline'] = time.monotonic()
+            raise asyncio.TimeoutError()
+
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, callback=times_out)
+            with self.assertLogs('respondent-home', 'WARNING') as cm:
+                with self.assertRaises(DeadlineExceeded):
+                    await RHService.get_case_by_uprn(request, self.uprn)
+            self.assertLogEvent(cm, 'request abandoned', reason=f'deadline exceeded waiting for {url}')
+
+        self.assertEqual(self.app.http_clients.client_for(url).breaker.failures, 0)
+
+    @unittest_run_loop
+    async def test_short_route_deadline_does_not_open_circuit(self):
+        self.app.route_deadlines[Start] = 0.01
+        breaker = self.app.http_clients.client_for(self.rhsvc_url).breaker
+
+        def times_out(url, **kwargs):
+            time.sleep(0.02)
+            raise asyncio.TimeoutError()
+
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(self.rhsvc_url, callback=times_out, repeat=True)
+            for _ in range(breaker.failure_threshold + 1):
+                with self.assertLogs('respondent-home', 'WARNING') as cm:
+                    await self.client.request('POST', self.post_start_en, data=self.start_data_valid)
+                self.assertLogEvent(cm, 'request abandoned', reason=f'deadline exceeded waiting for {self.rhsvc_url}')
+
+        self.assertEqual(breaker.state, 'closed')
+        self.assertEqual(breaker.failures, 0)
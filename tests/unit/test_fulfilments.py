@@ -0,0 +1,94 @@
+import json
+
+from unittest import TestCase
+
+from aiohttp.test_utils import unittest_run_loop
+from aioresponses import aioresponses
+
+from app.fulfilments import FulfilmentCatalogue
+from app.utils import RHService
+
+from . import RHTestCase
+
+
+def load_products():
+    products = []
+    for name in ('get_fulfilment_multi_post', 'get_fulfilment_single_sms'):
+        with open(f'tests/test_data/rhsvc/{name}.json') as fp:
+            products.extend(json.load(fp))
+    return products
+
+
+class TestFulfilmentCatalogue(TestCase):
+
+    def setUp(self):
+        self.catalogue = FulfilmentCatalogue(3600)
+        self.catalogue.products = load_products()
+
+    def test_find(self):
+        available_fulfilments = self.catalogue.find('HH', 'W', 'POST', 'QUESTIONNAIRE', 'false')
+        self.assertEqual([fulfilment['fulfilmentCode'] for fulfilment in available_fulfilments],
+                         ['P_OR_H2', 'P_OR_H2W'])
+        self.assertEqual(self.catalogue.hits, 1)
+
+    def test_find_filters_on_every_field(self):
+        self.assertIsNone(self.catalogue.find('CE', 'W', 'POST', 'QUESTIONNAIRE', 'false'))
+        self.assertIsNone(self.catalogue.find('HH', 'E', 'POST', 'QUESTIONNAIRE', 'false'))
+        self.assertIsNone(self.catalogue.find('HH', 'W', 'SMS', 'QUESTIONNAIRE', 'false'))
+        self.assertIsNone(self.catalogue.find('HH', 'W', 'POST', 'LARGE_PRINT', 'false'))
+        self.assertIsNone(self.catalogue.find('HH', 'W', 'POST', 'QUESTIONNAIRE', 'true'))
+        self.assertEqual(self.catalogue.misses, 5)
+
+    def test_find_not_loaded(self):
+        catalogue = FulfilmentCatalogue(3600)
+        self.assertIsNone(catalogue.find('HH', 'E', 'SMS', 'UAC', 'false'))
+        self.assertEqual(catalogue.misses, 1)
+
+    def test_disabled(self):
+        self.assertFalse(FulfilmentCatalogue(0).enabled)
+
+
+class TestFulfilmentCatalogueRefresh(RHTestCase):
+
+    @unittest_run_loop
+    async def test_refresh(self):
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(self.rhsvc_url_fulfilments, payload=load_products())
+            self.assertTrue(await self.app.fulfilment_catalogue.refresh(self.app))
+
+        self.assertEqual(len(self.app.fulfilment_catalogue.products), 3)
+        self.assertEqual(self.app.fulfilment_catalogue.refreshes, 1)
+
+    @unittest_run_loop
+    async def test_refresh_failure_keeps_products(self):
+        self.app.fulfilment_catalogue.products = load_products()
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(self.rhsvc_url_fulfilments, status=500)
+            with self.assertLogs('respondent-home', 'WARNING'):
+                self.assertFalse(await self.app.fulfilment_catalogue.refresh(self.app))
+
+        self.assertEqual(len(self.app.fulfilment_catalogue.products), 3)
+        self.assertEqual(self.app.fulfilment_catalogue.refresh_failures, 1)
+
+    @unittest_run_loop
+    async def test_get_fulfilment_from_catalogue(self):
+        self.app.fulfilment_catalogue.products = load_products()
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            available_fulfilments = await RHService.get_fulfilment(
+                self.make_request(), 'HH', 'E', 'SMS', 'UAC', 'false')
+
+        self.assertEqual(available_fulfilments[0]['fulfilmentCode'], 'UACHHT1')
+        self.assertEqual(len(mocked.requests), 0)
+
+    @unittest_run_loop
+    async def test_get_fulfilment_falls_back_to_rhsvc(self):
+        self.app.fulfilment_catalogue.products = load_products()
+        url = f'{self.rhsvc_url_fulfilments}?caseType=CE&region=E&deliveryChannel=SMS' \
+              f'&productGroup=UAC&individual=true'
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, payload=[{'fulfilmentCode': 'UACIT1', 'language': 'E'}])
+            available_fulfilments = await RHService.get_fulfilment(
+                self.make_request(), 'CE', 'E', 'SMS', 'UAC', 'true')
+
+        self.assertEqual(available_fulfilments[0]['fulfilmentCode'], 'UACIT1')
+        self.assertEqual(len(mocked.requests), 1)
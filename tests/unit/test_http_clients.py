@@ -0,0 +1,89 @@
+import asyncio
+
+from unittest import TestCase
+
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+
+from app.http_clients import FallbackClient, UpstreamClient, UpstreamClients
+
+
+def make_client(name, base_url, limit=10):
+    return UpstreamClient(name, base_url, limit=limit, keepalive_timeout=5, ttl_dns_cache=10, connect_timeout=5,
+                          timeout=30)
+
+
+class TestUpstreamClients(TestCase):
+
+    def setUp(self):
+        self.clients = UpstreamClients([
+            make_client('rhsvc', 'http://localhost:8071'),
+            make_client('address_index', 'http://localhost:9000'),
+            make_client('ad_lookup', 'http://localhost:8071/v1'),
+        ], FallbackClient(limit=10, keepalive_timeout=1, ttl_dns_cache=10, connect_timeout=5, timeout=30))
+
+    def test_client_for(self):
+        self.assertEqual(self.clients.client_for('http://localhost:8071/cases/uprn/10023122451').name, 'rhsvc')
+        self.assertEqual(self.clients.client_for('http://localhost:9000/addresses/rh/postcode/EX26GA').name,
+                         'address_index')
+
+    def test_client_for_longest_base_url(self):
+        self.assertEqual(self.clients.client_for('http://localhost:8071/v1/centres/postcode').name, 'ad_lookup')
+
+    def test_client_for_unknown_url(self):
+        with self.assertRaises(ValueError):
+            self.clients.client_for('http://localhost:5000/session')
+
+    def test_stats_not_open(self):
+        stats = self.clients.stats()
+        self.assertEqual(list(stats), ['ad_lookup', 'address_index', 'rhsvc', 'fallback'])
+        self.assertEqual(stats['rhsvc']['in_use'], 0)
+        self.assertEqual(stats['rhsvc']['requests'], 0)
+
+    def test_fallback_timed(self):
+        fallback = self.clients.fallback
+        with fallback.timed():
+            pass
+        with self.assertRaises(ValueError):
+            with fallback.timed():
+                raise ValueError('upstream failed')
+        stats = fallback.stats()
+        self.assertEqual(stats['fallbacks'], 2)
+        self.assertEqual(stats['failures'], 1)
+        self.assertIn('mean', stats['latency_ms'])
+
+
+class TestUpstreamClient(AioHTTPTestCase):
+
+    async def get_application(self):
+        async def slow(request):
+            await asyncio.sleep(0.05)
+            return web.Response(text='ok')
+
+        app = web.Application()
+        app.router.add_get('/slow', slow)
+        return app
+
+    @unittest_run_loop
+    async def test_requests_wait_for_a_connection(self):
+        client = make_client('slow', str(self.server.make_url('')), limit=1)
+        client.open()
+        try:
+            session = client.session
+            url = str(self.server.make_url('/slow'))
+
+            async def get():
+                async with session.get(url) as resp:
+                    return await resp.text()
+
+            self.assertEqual(await asyncio.gather(get(), get(), get()), ['ok'] * 3)
+            stats = client.stats()
+        finally:
+            await client.close()
+        self.assertEqual(stats['limit'], 1)
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['connections_created'], 1)
+        self.assertEqual(stats['connections_reused'], 2)
+        self.assertEqual(stats['queued'], 2)
+        self.assertGreater(stats['queue_wait_ms']['max'], 0)
+        self.assertEqual(stats['idle'], 1)
@@ -12,9 +12,30 @@ class TestInfo(RHTestCase):
         self.assertEqual(response.status, 200)
         self.assertIn('name', json)
         self.assertIn('version', json)
+        self.assertTrue(json['warmed_up'])
 
     @unittest_run_loop
     async def test_get_info_check(self):
         response = await self.client.request('GET', '/info?check=true')
         self.assertEqual(response.status, 200)
-        self.assertIn('ready', await response.json())
+        json = await response.json()
+        self.assertIn('ready', json)
+        self.assertEqual(json['circuits'], {'ad_lookup': 'closed', 'address_index': 'closed', 'rhsvc': 'closed'})
+
+    @unittest_run_loop
+    async def test_get_info_stats(self):
+        response = await self.client.request('GET', '/info?stats=true')
+        self.assertEqual(response.status, 200)
+        json = await response.json()
+        self.assertIn('stats', json)
+        self.assertIn('address_index_postcode_cache', json['stats'])
+        self.assertIn('page_cache', json['stats'])
+        self.assertIn('upstream_coalescing', json['stats'])
+        self.assertIn('upstream_pools', json['stats'])
+        self.assertIn('fulfilment_catalogue', json['stats'])
+        self.assertIn('redis_pool', json['stats'])
+        self.assertIn('session', json['stats'])
+        self.assertIn('session_codec', json['stats'])
+        self.assertIn('templates', json['stats'])
+        self.assertIn('template_fragments', json['stats'])
+        self.assertIn('warm_up', json['stats'])
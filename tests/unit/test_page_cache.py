@@ -0,0 +1,85 @@
+import aiohttp_jinja2
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+from aiohttp_utils.routing import ResourceRouter, add_resource_context
+from jinja2 import DictLoader
+
+from app import security
+from app.app_logging import logger_initial_config
+from app.cache import TTLCache
+from app.flash import flash_middleware
+from app.utils import View, cached_page
+
+
+class StaticPage(View):
+    renders = 0
+
+    @cached_page
+    @aiohttp_jinja2.template('static.html')
+    async def get(self, request):
+        StaticPage.renders += 1
+        display_region = request.match_info['display_region']
+        self.log_entry(request, display_region + '/static')
+        return {'display_region': display_region, 'page_url': View.gen_page_url(request)}
+
+
+@web.middleware
+async def request_middleware(request, handler):
+    request['client_ip'] = request['client_id'] = request['trace'] = None
+    return await handler(request)
+
+
+class TestCachedPage(AioHTTPTestCase):
+
+    async def get_application(self):
+        logger_initial_config(log_level='DEBUG', ext_log_level='DEBUG')
+        app = web.Application(middlewares=[request_middleware, flash_middleware], router=ResourceRouter())
+        app['URL_PATH_PREFIX'] = ''
+        app.page_cache = TTLCache(10, 60)
+        aiohttp_jinja2.setup(app, loader=DictLoader({
+            'static.html': '<script nonce="{{ cspNonce }}"></script>{{ display_region }} {{ page_url }}',
+        }), context_processors=[security.context_processor])
+        with add_resource_context(app, module='tests.unit.test_page_cache') as new_route:
+            new_route('/{display_region}/static/', StaticPage())
+        StaticPage.renders = 0
+        return app
+
+    @unittest_run_loop
+    async def test_page_cached_with_new_nonce(self):
+        bodies = []
+        for _ in range(2):
+            with self.assertLogs('respondent-home', 'INFO') as cm:
+                response = await self.client.request('GET', '/en/static/?utm_source=post')
+            self.assertIn("received GET on endpoint 'en/static'", cm.output[0])
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.content_type, 'text/html')
+            bodies.append(await response.text())
+        self.assertEqual(StaticPage.renders, 1)
+        self.assertNotEqual(bodies[0], bodies[1])
+        for body in bodies:
+            nonce = body.split('"')[1]
+            self.assertEqual(body, f'<script nonce="{nonce}"></script>en /static/')
+        self.assertEqual(self.app.page_cache.stats()['hits'], 1)
+
+    @unittest_run_loop
+    async def test_campaign_parameters_share_entry(self):
+        for source in ('post', 'email'):
+            response = await self.client.request('GET', '/en/static/?utm_source=' + source)
+            self.assertEqual(response.status, 200)
+            self.assertTrue((await response.text()).endswith('en /static/'))
+        self.assertEqual(StaticPage.renders, 1)
+        self.assertEqual(len(self.app.page_cache), 1)
+
+    @unittest_run_loop
+    async def test_keyed_on_url(self):
+        await self.client.request('GET', '/en/static/')
+        response = await self.client.request('GET', '/cy/static/')
+        self.assertTrue((await response.text()).endswith('cy /static/'))
+        self.assertEqual(StaticPage.renders, 2)
+
+    @unittest_run_loop
+    async def test_disabled(self):
+        self.app.page_cache = TTLCache(0, 60)
+        await self.client.request('GET', '/en/static/')
+        await self.client.request('GET', '/en/static/')
+        self.assertEqual(StaticPage.renders, 2)
@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+from unittest import TestCase
+
+from aiohttp.client_exceptions import ClientResponseError
+from aiohttp.test_utils import unittest_run_loop
+from aioresponses import aioresponses
+
+from app.exceptions import DeadlineExceeded
+from app.request import SingleFlight
+from app.utils import RHService
+
+from . import RHTestCase
+
+
+class TestSingleFlight(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.singleflight = SingleFlight()
+        self.calls = 0
+
+    def tearDown(self):
+        self.loop.close()
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return {'value': self.calls}
+
+    async def fail(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        raise ValueError('upstream failed')
+
+    def test_concurrent_calls_share_one_request(self):
+        results = self.loop.run_until_complete(asyncio.gather(
+            *[self.singleflight.do('key', self.fetch) for _ in range(3)], loop=self.loop))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{'value': 1}] * 3)
+        self.assertEqual(self.singleflight.stats(), {'in_flight': 0, 'leaders': 1, 'coalesced': 2})
+
+    def test_followers_receive_copies(self):
+        results = self.loop.run_until_complete(asyncio.gather(
+            self.singleflight.do('key', self.fetch), self.singleflight.do('key', self.fetch), loop=self.loop))
+        results[1]['value'] = 2
+        self.assertEqual(results[0], {'value': 1})
+
+    def test_different_keys_not_shared(self):
+        self.loop.run_until_complete(asyncio.gather(
+            self.singleflight.do('first', self.fetch), self.singleflight.do('second', self.fetch), loop=self.loop))
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.singleflight.coalesced, 0)
+
+    def test_sequential_calls_not_shared(self):
+        self.loop.run_until_complete(self.singleflight.do('key', self.fetch))
+        self.loop.run_until_complete(self.singleflight.do('key', self.fetch))
+        self.assertEqual(self.calls, 2)
+        self.assertNotIn('key', self.singleflight)
+
+    def test_error_raised_to_every_caller(self):
+        results = self.loop.run_until_complete(asyncio.gather(
+            self.singleflight.do('key', self.fail), self.singleflight.do('key', self.fail),
+            loop=self.loop, return_exceptions=True))
+        self.assertEqual(self.calls, 1)
+        for result in results:
+            self.assertIsInstance(result, ValueError)
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        async def run():
+            leader = asyncio.ensure_future(self.singleflight.do('key', self.fetch))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(self.singleflight.do('key', self.fetch))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        self.assertEqual(self.loop.run_until_complete(run()), {'value': 1})
+
+
+class TestMakeRequestCoalescing(RHTestCase):
+
+    @unittest_run_loop
+    async def test_concurrent_gets_coalesced(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, payload=self.rhsvc_case_by_uprn_hh_e.result())
+            results = await asyncio.gather(RHService.get_case_by_uprn(self.make_request(), self.uprn),
+                                           RHService.get_case_by_uprn(self.make_request(), self.uprn))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(len(mocked.requests), 1)
+        self.assertEqual(self.app.singleflight.coalesced, 1)
+
+    @unittest_run_loop
+    async def test_concurrent_get_errors_shared(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, status=404)
+            results = await asyncio.gather(RHService.get_case_by_uprn(self.make_request(), self.uprn),
+                                           RHService.get_case_by_uprn(self.make_request(), self.uprn),
+                                           return_exceptions=True)
+
+        for result in results:
+            self.assertIsInstance(result, ClientResponseError)
+        self.assertEqual(self.app.singleflight.stats()['in_flight'], 0)
+
+    @unittest_run_loop
+    async def test_follower_with_time_left_retries_after_leader_deadline(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        leader = self.make_request(deadline=10)
+
+        def times_out(url, **kwargs):
+            leader['deadline'] = time.monotonic()
+            raise asyncio.TimeoutError()
+
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, callback=times_out)
+            mocked.get(url, payload=self.rhsvc_case_by_uprn_hh_e.result())
+            results = await asyncio.gather(RHService.get_case_by_uprn(leader, self.uprn),
+                                           RHService.get_case_by_uprn(self.make_request(deadline=10), self.uprn),
+                                           return_exceptions=True)
+            self.assertEqual(sum(len(calls) for calls in mocked.requests.values()), 2)
+
+        self.assertIsInstance(results[0], DeadlineExceeded)
+        self.assertEqual(results[1]['uprn'], self.rhsvc_case_by_uprn_hh_e.result()['uprn'])
+        self.assertEqual(self.app.singleflight.coalesced, 1)
+
+
+class TestMakeRequestFallback(RHTestCase):
+
+    @unittest_run_loop
+    async def test_fallback_after_pooled_attempts(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, status=503)
+            mocked.get(url, status=503)
+            mocked.get(url, payload=self.rhsvc_case_by_uprn_hh_e.result())
+            result = await RHService.get_case_by_uprn(self.make_request(), self.uprn)
+
+        self.assertEqual(result['uprn'], self.rhsvc_case_by_uprn_hh_e.result()['uprn'])
+        stats = self.app.http_clients.fallback.stats()
+        self.assertEqual(stats['fallbacks'], 1)
+        self.assertEqual(stats['failures'], 0)
+
+    @unittest_run_loop
+    async def test_fallback_failure_counted(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            for _ in range(5):
+                mocked.get(url, status=503)
+            with self.assertRaises(ClientResponseError):
+                await RHService.get_case_by_uprn(self.make_request(), self.uprn)
+
+        stats = self.app.http_clients.fallback.stats()
+        self.assertEqual(stats['fallbacks'], 1)
+        self.assertEqual(stats['failures'], 1)
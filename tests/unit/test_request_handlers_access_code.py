@@ -23,6 +23,13 @@ class TestRequestHandlersAccessCode(TestHelpers):
         await self.check_post_confirm_send_by_text(
             self.post_request_access_code_confirm_send_by_text_en, 'en', 'HH', 'E', 'false')
 
+    @unittest_run_loop
+    async def test_request_access_code_select_address_streamed_ew(self):
+        await self.check_get_enter_address(self.get_request_access_code_enter_address_en, 'en')
+        await self.check_post_enter_address(self.post_request_access_code_enter_address_en, 'en')
+        await self.check_select_address_streamed(self.get_request_access_code_select_address_en,
+                                                 self.post_request_access_code_select_address_en, 'en')
+
     @unittest_run_loop
     async def test_request_access_code_sms_happy_path_hh_ew_w(self):
         await self.check_get_enter_address(self.get_request_access_code_enter_address_en, 'en')
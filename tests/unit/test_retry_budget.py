@@ -0,0 +1,106 @@
+from unittest import TestCase
+
+from aiohttp.client_exceptions import ClientResponseError
+from aiohttp.test_utils import unittest_run_loop
+from aioresponses import aioresponses
+from multidict import CIMultiDict
+
+from app.request import retry_after
+from app.retry_budget import RetryBudget
+from app.utils import RHService
+
+from . import RHTestCase
+
+
+class TestRetryBudget(TestCase):
+
+    def test_min_retries(self):
+        budget = RetryBudget('rhsvc', ratio=0.0, min_retries=2)
+        self.assertTrue(budget.spend())
+        self.assertTrue(budget.spend())
+        self.assertFalse(budget.spend())
+        self.assertEqual(budget.stats(), {'requests_in_window': 0, 'retries_in_window': 2, 'spent': 2, 'denied': 1})
+
+    def test_ratio_of_requests(self):
+        budget = RetryBudget('rhsvc', ratio=0.1, min_retries=0)
+        for _ in range(20):
+            budget.record_request()
+        self.assertTrue(budget.spend())
+        self.assertTrue(budget.spend())
+        self.assertFalse(budget.spend())
+
+    def test_window_expires(self):
+        budget = RetryBudget('rhsvc', ratio=0.0, min_retries=1)
+        self.assertTrue(budget.spend())
+        self.assertFalse(budget.spend())
+        for bucket in budget._buckets:
+            bucket[0] -= budget.window
+        self.assertTrue(budget.spend())
+
+
+class TestRetryAfter(TestCase):
+
+    def response_error(self, status, headers=None):
+        return ClientResponseError(None, (), status=status, headers=CIMultiDict(headers or {}))
+
+    def test_seconds(self):
+        self.assertEqual(retry_after(self.response_error(429, {'Retry-After': '2'})), 2)
+
+    def test_date_in_past(self):
+        self.assertEqual(retry_after(self.response_error(503, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})), 0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(retry_after(self.response_error(429)))
+        self.assertIsNone(retry_after(self.response_error(429, {'Retry-After': 'soon'})))
+        self.assertIsNone(retry_after(ValueError()))
+
+
+class TestMakeRequestRetries(RHTestCase):
+
+    @unittest_run_loop
+    async def test_429_with_retry_after_retried(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, status=429, headers={'Retry-After': '0'})
+            mocked.get(url, payload=self.rhsvc_case_by_uprn_hh_e.result())
+            result = await RHService.get_case_by_uprn(self.make_request(), self.uprn)
+
+        self.assertEqual(result['uprn'], self.rhsvc_case_by_uprn_hh_e.result()['uprn'])
+        self.assertEqual(self.app.http_clients.client_for(url).retry_budget.spent, 1)
+
+    @unittest_run_loop
+    async def test_429_without_retry_after_not_retried(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, status=429)
+            mocked.get(url, payload=self.rhsvc_case_by_uprn_hh_e.result())
+            with self.assertRaises(ClientResponseError):
+                await RHService.get_case_by_uprn(self.make_request(), self.uprn)
+
+        self.assertEqual(self.app.http_clients.client_for(url).retry_budget.spent, 0)
+
+    @unittest_run_loop
+    async def test_429_retry_after_too_long_not_retried(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get(url, status=429, headers={'Retry-After': '3600'})
+            with self.assertRaises(ClientResponseError):
+                await RHService.get_case_by_uprn(self.make_request(), self.uprn)
+
+    @unittest_run_loop
+    async def test_exhausted_budget_stops_retries(self):
+        url = f'{self.rhsvc_cases_by_uprn_url}{self.uprn}'
+        budget = self.app.http_clients.client_for(url).retry_budget
+        budget.min_retries = 1
+        budget.ratio = 0
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            for _ in range(5):
+                mocked.get(url, status=503)
+            with self.assertLogs('respondent-home', 'WARNING') as cm:
+                with self.assertRaises(ClientResponseError):
+                    await RHService.get_case_by_uprn(self.make_request(), self.uprn)
+            self.assertLogEvent(cm, 'retry budget exhausted')
+            self.assertEqual(sum(len(calls) for calls in mocked.requests.values()), 2)
+
+        self.assertEqual(budget.stats()['spent'], 1)
+        self.assertEqual(budget.stats()['denied'], 1)
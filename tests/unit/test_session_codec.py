@@ -0,0 +1,67 @@
+import json
+
+from unittest import TestCase
+
+from app.session_codec import SessionCodec, SizeHistogram, MSGPACK, MSGPACK_ZLIB
+
+
+class TestSessionCodec(TestCase):
+
+    session = {
+        'created': 1600000000,
+        'session': {
+            'client_id': '36be6b97-b4de-4718-8a74-8b27fb03ca8c',
+            'attributes': {'addressLine1': '1 Gate Reach', 'postcode': 'EX2 6GA', 'individual': False},
+            'flash': [{'text': 'Enter a postcode', 'level': 'ERROR', 'type': 'POSTCODE_ENTER_ERROR'}]
+        }
+    }
+
+    def test_json(self):
+        codec = SessionCodec('json', 1024)
+        data = codec.encode(self.session)
+        self.assertEqual(json.loads(data.decode('utf-8')), self.session)
+        self.assertEqual(codec.decode(data), self.session)
+
+    def test_msgpack(self):
+        codec = SessionCodec('msgpack', 1024)
+        data = codec.encode(self.session)
+        self.assertEqual(data[:1], MSGPACK)
+        self.assertLess(len(data), len(json.dumps(self.session)))
+        self.assertEqual(codec.decode(data), self.session)
+
+    def test_msgpack_compressed_above_threshold(self):
+        codec = SessionCodec('msgpack', 64)
+        data = codec.encode(self.session)
+        self.assertEqual(data[:1], MSGPACK_ZLIB)
+        self.assertEqual(codec.decode(data), self.session)
+
+    def test_msgpack_threshold_disabled(self):
+        codec = SessionCodec('msgpack', 0)
+        self.assertEqual(codec.encode(self.session)[:1], MSGPACK)
+
+    def test_decode_json_with_msgpack_codec(self):
+        codec = SessionCodec('msgpack', 1024)
+        self.assertEqual(codec.decode(json.dumps(self.session).encode('utf-8')), self.session)
+
+    def test_decode_invalid(self):
+        codec = SessionCodec('msgpack', 1024)
+        for data in (b'not json', MSGPACK_ZLIB + b'not zlib', MSGPACK + b'\xc1'):
+            with self.assertRaises(ValueError):
+                codec.decode(data)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            SessionCodec('pickle', 1024)
+
+
+class TestSizeHistogram(TestCase):
+
+    def test_stats(self):
+        histogram = SizeHistogram([100, 200])
+        for size in (50, 100, 150, 250):
+            histogram.record(size)
+        self.assertEqual(histogram.stats(), {
+            'count': 4,
+            'mean': 138,
+            'buckets': {'<=100': 2, '<=200': 1, '>200': 1}
+        })
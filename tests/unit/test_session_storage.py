@@ -0,0 +1,223 @@
+import json
+import time
+
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request, unittest_run_loop
+from aiohttp_session import STORAGE_KEY, SESSION_KEY, Session
+from aioredis import ConnectionPool, Redis, RedisError
+
+from app import session
+from app.session import RHRedisStorage, get_session_data, set_session_data
+
+from . import RHTestCase
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def get(self, key):
+        self.commands.append(('get', key))
+        return self
+
+    def expire(self, key, seconds):
+        self.commands.append(('expire', key, seconds))
+        return self
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        results = []
+        for command, key, *args in self.commands:
+            if command == 'get':
+                results.append(self.redis.data.get(key))
+            else:
+                self.redis.expiry[key] = args[0]
+                results.append(key in self.redis.data)
+        return results
+
+
+class FakeRedis:
+    """
+    Stands in for the Redis client, keeping values in a dict and counting round trips.
+    """
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.round_trips += 1
+        self.data[key] = value.encode('utf-8') if isinstance(value, str) else value
+        self.expiry[key] = ex
+
+
+class TestRedisLifecycle(RHTestCase):
+
+    @unittest_run_loop
+    async def test_redis_not_configured(self):
+        self.assertIsNone(self.app.redis_pool)
+        self.assertTrue(await session.check_redis(self.app))
+        self.assertEqual(session.redis_pool_stats(self.app), {'enabled': False})
+
+    @unittest_run_loop
+    async def test_make_redis_pool_fails_fast(self):
+        with self.assertLogs('respondent-home', 'ERROR') as cm:
+            with self.assertRaises((OSError, RedisError)):
+                await session.make_redis_pool('localhost', '1', '1', '5')
+        self.assertLogEvent(cm, 'failed to create redis connection')
+
+    @unittest_run_loop
+    async def test_make_redis_pool_unix_socket_fails_fast(self):
+        with self.assertLogs('respondent-home', 'ERROR') as cm:
+            with self.assertRaises((OSError, RedisError)):
+                await session.make_redis_pool('', '', '1', '5', unix_socket='/nonexistent/redis.sock')
+        self.assertLogEvent(cm, 'failed to create redis connection')
+
+    @unittest_run_loop
+    async def test_redis_pool_stats(self):
+        app = web.Application()
+        app.redis_pool = Redis(connection_pool=ConnectionPool(host='localhost', port=6379, max_connections=5))
+        self.assertEqual(session.redis_pool_stats(app), {'enabled': True, 'size': 0, 'in_use': 0, 'maxsize': 5})
+
+    @unittest_run_loop
+    async def test_check_redis_failure(self):
+        app = web.Application()
+        app.redis_pool = mock.Mock()
+        app.redis_pool.ping.side_effect = RedisError('down')
+        with self.assertLogs('respondent-home', 'ERROR'):
+            self.assertFalse(await session.check_redis(app))
+
+
+class TestRHRedisStorage(RHTestCase):
+
+    def make_session_request(self, cookie=None):
+        headers = {'Cookie': f'RH_SESSION={cookie}'} if cookie else None
+        request = make_mocked_request('GET', '/', headers=headers, app=self.app)
+        request.match_info.route.name = 'SignedOut:get'
+        request['client_ip'] = None
+        request['client_id'] = '36be6b97-b4de-4718-8a74-8b27fb03ca8c'
+        request['trace'] = None
+        return request
+
+    def setUp(self):
+        super().setUp()
+        self.storage = RHRedisStorage(cookie_name='RH_SESSION', max_age=2700, data_max_age=600,
+                                      key_factory=lambda: 'identity')
+        self.redis = FakeRedis()
+
+    @unittest_run_loop
+    async def test_save_and_load_session(self):
+        self.app.redis_pool = self.redis
+        new_session = await self.storage.load_session(self.make_session_request())
+        self.assertTrue(new_session.new)
+        new_session['client_id'] = 'client'
+
+        response = web.Response()
+        await self.storage.save_session(self.make_session_request(), response, new_session)
+        self.assertEqual(response.cookies['RH_SESSION'].value, 'identity')
+        self.assertEqual(self.redis.expiry['RH_SESSION_identity'], 2700)
+
+        self.redis.expiry.clear()
+        self.redis.round_trips = 0
+        loaded = await self.storage.load_session(self.make_session_request('identity'))
+        self.assertFalse(loaded.new)
+        self.assertEqual(loaded['client_id'], 'client')
+        self.assertEqual(self.redis.expiry['RH_SESSION_identity'], 2700)
+        self.assertEqual(self.redis.round_trips, 1)
+
+    @unittest_run_loop
+    async def test_unchanged_session_not_written(self):
+        self.app.redis_pool = self.redis
+        self.redis.data['RH_SESSION_identity'] = self.app.session_codec.encode(
+            {'created': 1600000000, 'session': {'client_id': 'client'}})
+        request = self.make_session_request('identity')
+        loaded = await self.storage.load_session(request)
+        loaded['client_id'] = 'client'
+
+        self.redis.round_trips = 0
+        response = web.Response()
+        await self.storage.save_session(request, response, loaded)
+        self.assertEqual(self.redis.round_trips, 0)
+        self.assertEqual(response.cookies['RH_SESSION'].value, 'identity')
+        self.assertEqual(self.app.session_stats.stats(), {'SignedOut:get': {'reads': 1, 'skipped_writes': 1}})
+
+    @unittest_run_loop
+    async def test_changed_session_written(self):
+        self.app.redis_pool = self.redis
+        self.redis.data['RH_SESSION_identity'] = b'{"created": 1600000000, "session": {"client_id": "client"}}'
+        request = self.make_session_request('identity')
+        loaded = await self.storage.load_session(request)
+        loaded['flash'] = ['message']
+
+        await self.storage.save_session(request, web.Response(), loaded)
+        self.assertIn(b'message', self.redis.data['RH_SESSION_identity'])
+        self.assertEqual(self.app.session_stats.stats(), {'SignedOut:get': {'reads': 1, 'writes': 1}})
+
+    @unittest_run_loop
+    async def test_json_session_rewritten_with_codec(self):
+        self.app.redis_pool = self.redis
+        self.redis.data['RH_SESSION_identity'] = json.dumps(
+            {'created': int(time.time()), 'session': {'client_id': 'client'}}).encode('utf-8')
+        request = self.make_session_request('identity')
+        loaded = await self.storage.load_session(request)
+        self.assertEqual(loaded['client_id'], 'client')
+        loaded.changed()
+
+        await self.storage.save_session(request, web.Response(), loaded)
+        self.assertEqual(self.redis.data['RH_SESSION_identity'][:1], b'\x01')
+        self.assertEqual(self.app.session_codec.sizes.stats()['count'], 1)
+
+    @unittest_run_loop
+    async def test_load_expired_session(self):
+        self.app.redis_pool = self.redis
+        loaded = await self.storage.load_session(self.make_session_request('identity'))
+        self.assertTrue(loaded.new)
+        self.assertIsNone(loaded.identity)
+
+    @unittest_run_loop
+    async def test_load_session_without_redis(self):
+        with self.assertRaises(RedisError):
+            await self.storage.load_session(self.make_session_request('identity'))
+
+    @unittest_run_loop
+    async def test_session_data(self):
+        self.app.redis_pool = self.redis
+        request = self.make_session_request()
+        request[STORAGE_KEY] = self.storage
+        request[SESSION_KEY] = Session('identity', data={'session': {}}, new=False, max_age=2700)
+
+        await set_session_data(request, 'addresses', {'postcode': 'EX2 6GA'})
+        self.assertEqual(await get_session_data(request, 'addresses'), {'postcode': 'EX2 6GA'})
+        self.assertEqual(self.redis.expiry['RH_SESSION_identity_addresses'], 600)
+
+    @unittest_run_loop
+    async def test_session_data_without_redis(self):
+        request = self.make_session_request()
+        request[STORAGE_KEY] = self.storage
+        request[SESSION_KEY] = Session('identity', data={'session': {}}, new=False, max_age=2700)
+
+        with self.assertLogs('respondent-home', 'WARNING'):
+            self.assertIsNone(await get_session_data(request, 'addresses'))
+        with self.assertLogs('respondent-home', 'WARNING'):
+            await set_session_data(request, 'addresses', {})
+
+    def tearDown(self):
+        self.app.redis_pool = None
+        super().tearDown()
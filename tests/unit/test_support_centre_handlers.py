@@ -5,6 +5,7 @@ from aioresponses import aioresponses
 
 from . import RHTestCase
 
+import re
 import urllib.parse
 
 
@@ -72,6 +73,43 @@ class TestSupportCentre(RHTestCase):
             self.assertIn(self.content_support_centre_enter_postcode_secondary_cy, resp_content)
             self.assertIn(self.content_support_centre_enter_postcode_error_empty_cy, resp_content)
 
+    @unittest_run_loop
+    async def test_get_support_centre_enter_postcode_cached_en(self):
+        self.app['GTM_CONTAINER_ID'] = 'GTM-XXXXXXX'
+        self.app['GTM_AUTH'] = '12345'
+        nonces = []
+        for _ in range(2):
+            with self.assertLogs('respondent-home', 'INFO') as cm:
+                response = await self.client.request('GET', self.get_support_centre_enter_postcode_en)
+            self.assertLogEvent(cm, "received GET on endpoint 'en/find-a-support-centre'")
+            self.assertEqual(response.status, 200)
+            nonce = re.search(r"'nonce-([^']+)'", response.headers['Content-Security-Policy']).group(1)
+            contents = await response.text()
+            self.assertIn(f'<script nonce="{nonce}">', contents)
+            self.assertIn(self.content_support_centre_enter_postcode_page_title_en, contents)
+            nonces.append(nonce)
+        self.assertNotEqual(nonces[0], nonces[1])
+        self.assertEqual(self.app.page_cache.stats()['hits'], 1)
+
+    @unittest_run_loop
+    async def test_get_support_centre_enter_postcode_flashed_not_cached_en(self):
+        await self.client.request('GET', self.get_support_centre_enter_postcode_en)
+
+        response = await self.client.request('POST', self.post_support_centre_enter_postcode_en,
+                                             data=self.support_centre_enter_postcode_input_invalid)
+        self.assertEqual(response.status, 200)
+        contents = await response.text()
+        self.assertIn(self.content_support_centre_enter_postcode_page_title_error_en, contents)
+        self.assertIn(self.content_support_centre_enter_postcode_error_invalid_en, contents)
+        self.assertEqual(self.app.page_cache.stats()['hits'], 0)
+
+        response = await self.client.request('GET', self.get_support_centre_enter_postcode_en)
+        self.assertEqual(response.status, 200)
+        contents = await response.text()
+        self.assertIn(self.content_support_centre_enter_postcode_page_title_en, contents)
+        self.assertNotIn(self.content_support_centre_enter_postcode_error_invalid_en, contents)
+        self.assertEqual(self.app.page_cache.stats()['hits'], 1)
+
     @unittest_run_loop
     async def test_get_support_centre_enter_postcode_invalid_en(self):
         with self.assertLogs('respondent-home', 'INFO') as cm:
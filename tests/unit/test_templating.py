@@ -0,0 +1,161 @@
+import os
+import stat
+import tempfile
+
+from unittest import TestCase
+
+import aiohttp_jinja2
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+from aiohttp_session import SimpleCookieStorage, session_middleware
+from jinja2 import DictLoader, Environment
+
+from app import templating
+from app.flash import flash, flash_middleware
+from app.templating import FragmentCache, SharedBytecodeCache, TemplatePrecompiler, stream_template
+
+TEMPLATES = {
+    'base.html': '<p>{% block content %}{% endblock %}</p>',
+    'page.html': "{% extends 'base.html' %}{% block content %}{{ name }}{% endblock %}",
+    'components/_macro.njk': '{% macro greet(name) %}Hello {{ name }}{% endmacro %}',
+    'README.md': 'not a template',
+}
+
+
+class TestSharedBytecodeCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_env(self, directory):
+        return Environment(loader=DictLoader(TEMPLATES), bytecode_cache=SharedBytecodeCache(directory))
+
+    def test_bytecode_shared(self):
+        self.assertEqual(self.make_env(self.directory.name).get_template('page.html').render(name='Bob'), '<p>Bob</p>')
+        files = os.listdir(self.directory.name)
+        self.assertEqual(len(files), 2)
+        for name in files:
+            self.assertTrue(name.endswith('.cache'))
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.directory.name, name)).st_mode), 0o644)
+        self.assertEqual(self.make_env(self.directory.name).get_template('page.html').render(name='Bob'), '<p>Bob</p>')
+
+    def test_unwritable_directory(self):
+        env = self.make_env(os.path.join(self.directory.name, 'missing'))
+        with self.assertLogs('respondent-home', 'WARNING'):
+            self.assertEqual(env.get_template('page.html').render(name='Bob'), '<p>Bob</p>')
+
+
+class TestTemplatePrecompiler(TestCase):
+
+    def test_compile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            precompiler = TemplatePrecompiler(directory)
+            env = Environment(loader=DictLoader(TEMPLATES), bytecode_cache=precompiler.bytecode_cache())
+            self.assertEqual(precompiler.compile(env), 3)
+            self.assertEqual(len(os.listdir(directory)), 3)
+        stats = precompiler.stats()
+        self.assertTrue(stats['enabled'])
+        self.assertEqual(stats['templates'], 3)
+        self.assertIsNotNone(stats['load_ms'])
+
+    def test_disabled(self):
+        precompiler = TemplatePrecompiler('')
+        self.assertFalse(precompiler.enabled)
+        self.assertIsNone(precompiler.bytecode_cache())
+
+
+class TestFragmentCache(TestCase):
+
+    def make_env(self, maxsize=10):
+        env = Environment(loader=DictLoader({
+            'page.html': "{% cache 'banner' %}<script nonce=\"{{ cspNonce }}\">{{ text }}</script>{% endcache %}"
+                         "{% cache 'title', title %}{{ title }}{% endcache %}",
+        }), extensions=['app.templating.FragmentCacheExtension'], autoescape=True)
+        env.fragment_cache = FragmentCache(maxsize)
+        return env
+
+    def test_nonce_substituted(self):
+        env = self.make_env()
+        template = env.get_template('page.html')
+        self.assertEqual(template.render(cspNonce='abc', text='Hello', title='One'),
+                         '<script nonce="abc">Hello</script>One')
+        # cached output is reused, with this request's nonce
+        self.assertEqual(template.render(cspNonce='xyz', text='Changed', title='One'),
+                         '<script nonce="xyz">Hello</script>One')
+        self.assertEqual(env.fragment_cache.stats(), {'size': 2, 'maxsize': 10, 'hits': 2, 'misses': 2})
+
+    def test_keyed_on_region_locale_and_values(self):
+        template = self.make_env().get_template('page.html')
+        template.render(cspNonce='abc', text='Hello', title='One', display_region='en', locale='en')
+        self.assertEqual(template.render(cspNonce='abc', text='Helo', title='Two', display_region='cy', locale='cy'),
+                         '<script nonce="abc">Helo</script>Two')
+        self.assertEqual(template.render(cspNonce='abc', text='Hello', title='Three', display_region='en', locale='en'),
+                         '<script nonce="abc">Hello</script>Three')
+
+    def test_escaping(self):
+        template = self.make_env().get_template('page.html')
+        for _ in range(2):
+            self.assertEqual(template.render(cspNonce='abc', text='<b>', title='<i>'),
+                             '<script nonce="abc">&lt;b&gt;</script>&lt;i&gt;')
+
+    def test_disabled(self):
+        env = self.make_env(maxsize=0)
+        template = env.get_template('page.html')
+        template.render(cspNonce='abc', text='Hello', title='One')
+        self.assertEqual(template.render(cspNonce='xyz', text='Changed', title='One'),
+                         '<script nonce="xyz">Changed</script>One')
+        self.assertEqual(env.fragment_cache.stats()['size'], 0)
+
+
+@web.middleware
+async def request_middleware(request, handler):
+    request['client_ip'] = request['client_id'] = request['trace'] = None
+    return await handler(request)
+
+
+class TestStreamTemplate(AioHTTPTestCase):
+
+    async def get_application(self):
+        app = web.Application(middlewares=[session_middleware(SimpleCookieStorage()), flash_middleware,
+                                           request_middleware])
+        aiohttp_jinja2.setup(app, loader=DictLoader({
+            'list.html': '{% for message in get_flashed_messages() %}<b>{{ message.text }}</b>{% endfor %}'
+                         '{% for item in items %}<i>{{ item }}</i>{% endfor %}',
+            'broken.html': '{{ missing.attribute }}',
+        }))
+
+        async def flash_message(request):
+            flash(request, {'text': 'Select an address'})
+            return web.Response()
+
+        async def stream(request):
+            return await stream_template(request.match_info['name'], request, {'items': range(5000)})
+
+        app.router.add_get('/flash', flash_message)
+        app.router.add_get('/{name}', stream)
+        return app
+
+    @unittest_run_loop
+    async def test_streamed(self):
+        response = await self.client.request('GET', '/list.html')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.content_type, 'text/html')
+        self.assertEqual(response.headers['Transfer-Encoding'], 'chunked')
+        self.assertEqual(await response.text(), ''.join(f'<i>{item}</i>' for item in range(5000)))
+        self.assertGreater(len(await response.read()), templating.STREAM_BUFFER_SIZE)
+
+    @unittest_run_loop
+    async def test_flashed_messages_popped_before_sent(self):
+        await self.client.request('GET', '/flash')
+        response = await self.client.request('GET', '/list.html')
+        self.assertTrue((await response.text()).startswith('<b>Select an address</b><i>0</i>'))
+        response = await self.client.request('GET', '/list.html')
+        self.assertTrue((await response.text()).startswith('<i>0</i>'))
+
+    @unittest_run_loop
+    async def test_error_before_sent(self):
+        response = await self.client.request('GET', '/broken.html')
+        self.assertEqual(response.status, 500)
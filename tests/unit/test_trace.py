@@ -1,6 +1,7 @@
-from app.trace import get_trace
+from app.trace import get_trace, sign_client_id, CLIENT_ID_COOKIE
 from .helpers import TestHelpers
 from aiohttp.test_utils import unittest_run_loop
+from unittest import mock
 from uuid import UUID
 
 
@@ -64,3 +65,49 @@ class TestTraceHandling(TestHelpers):
                                       allow_redirects=False, headers=header)
             log_record = self.assertLogEvent(cm, "received GET on endpoint 'en/start'", trace='0123456789')
             self.assertTrue(self.validate_uuid4(log_record.__dict__['client_id']))
+
+    @unittest_run_loop
+    async def test_client_id_from_signed_cookie(self):
+        self.clear_session()
+        client_id = '36be6b97-b4de-4718-8a74-8b27fb03ca8c'
+        cookie = {CLIENT_ID_COOKIE: f"{client_id}.{sign_client_id(self.app['CLIENT_ID_SECRET'], client_id)}"}
+        with self.assertLogs('respondent-home', 'INFO') as cm:
+            response = await self.client.request('GET', '/en/start/', allow_redirects=False, cookies=cookie)
+            self.assertLogEvent(cm, "received GET on endpoint 'en/start'", client_id=client_id)
+        self.assertNotIn(CLIENT_ID_COOKIE, response.cookies)
+
+    @unittest_run_loop
+    async def test_client_id_cookie_with_bad_signature(self):
+        self.clear_session()
+        cookie = {CLIENT_ID_COOKIE: '36be6b97-b4de-4718-8a74-8b27fb03ca8c.0123456789abcdef'}
+        response = await self.client.request('GET', '/info', cookies=cookie)
+        client_id = response.cookies[CLIENT_ID_COOKIE].value.rsplit('.', 1)[0]
+        self.assertNotEqual(client_id, '36be6b97-b4de-4718-8a74-8b27fb03ca8c')
+        self.assertTrue(self.validate_uuid4(client_id))
+
+    @unittest_run_loop
+    async def test_client_id_without_session(self):
+        self.clear_session()
+        response = await self.client.request('GET', '/info')
+        self.assertEqual(response.status, 200)
+        self.assertNotIn('RH_SESSION', response.cookies)
+        client_id, signature = response.cookies[CLIENT_ID_COOKIE].value.rsplit('.', 1)
+        self.assertTrue(self.validate_uuid4(client_id))
+        self.assertEqual(signature, sign_client_id(self.app['CLIENT_ID_SECRET'], client_id))
+
+    @unittest_run_loop
+    async def test_client_id_on_streamed_response(self):
+        self.clear_session()
+        self.app['SELECT_ADDRESS_STREAM_THRESHOLD'] = '0'
+        cookie = {'RH_SESSION': '{ "session": {"attributes": {"postcode": "EX2 6GA"}}}'}
+        with self.assertLogs('respondent-home', 'INFO') as cm, \
+                mock.patch('app.utils.AddressIndex.get_ai_postcode') as mocked_get_ai_postcode:
+            mocked_get_ai_postcode.return_value = self.ai_postcode_results
+            response = await self.client.request('GET', self.get_request_access_code_select_address_en,
+                                                  cookies=cookie)
+            log_record = self.assertLogEvent(cm, "received GET on endpoint 'en/request/access-code/select-address'")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers['Transfer-Encoding'], 'chunked')
+        client_id, signature = response.cookies[CLIENT_ID_COOKIE].value.rsplit('.', 1)
+        self.assertEqual(client_id, log_record.__dict__['client_id'])
+        self.assertEqual(signature, sign_client_id(self.app['CLIENT_ID_SECRET'], client_id))
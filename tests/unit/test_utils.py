@@ -1,10 +1,15 @@
-from app.utils import ProcessPostcode, ProcessMobileNumber, InvalidDataError, InvalidDataErrorWelsh, FlashMessage, View
+from app.utils import ProcessPostcode, ProcessMobileNumber, InvalidDataError, InvalidDataErrorWelsh, FlashMessage, View, \
+    AddressIndex, RHService
 
 from . import RHTestCase
+import asyncio
 import datetime
 
 from unittest import mock
 
+from aiohttp.client_exceptions import ClientResponseError
+from aiohttp.test_utils import unittest_run_loop
+
 
 class TestUtils(RHTestCase):
 
@@ -378,3 +383,82 @@ class TestUtils(RHTestCase):
             str(cm.exception)
         )
         # With the correct message
+
+    @unittest_run_loop
+    async def test_get_postcode_return_uses_session_addresses(self):
+        session_addresses = asyncio.Future()
+        session_addresses.set_result({'postcode': self.postcode_valid, 'epoch': '', 'total': 1,
+                                      'addresses': [['10023122451', '1 Gate Reach, Exeter, EX2 6GA']]})
+        with mock.patch('app.utils.get_session_data') as mocked_get_session_data, \
+                mock.patch('app.utils.AddressIndex.get_ai_postcode') as mocked_get_ai_postcode:
+            mocked_get_session_data.return_value = session_addresses
+            address_content = await AddressIndex.get_postcode_return(self.make_request(), self.postcode_valid, 'en')
+
+        mocked_get_ai_postcode.assert_not_called()
+        self.assertEqual(address_content['total_matches'], 1)
+        self.assertEqual(address_content['addresses'][0]['value'], '10023122451')
+        self.assertEqual(address_content['addresses'][0]['label']['text'], '1 Gate Reach, Exeter, EX2 6GA')
+        self.assertEqual(address_content['addresses'][-1]['value'], 'xxxx')
+
+    @unittest_run_loop
+    async def test_get_postcode_return_stores_session_addresses(self):
+        session_addresses = asyncio.Future()
+        session_addresses.set_result({'postcode': 'GU34 6DU', 'epoch': '', 'total': 0, 'addresses': []})
+        stored = asyncio.Future()
+        stored.set_result(None)
+        with mock.patch('app.utils.get_session_data') as mocked_get_session_data, \
+                mock.patch('app.utils.set_session_data') as mocked_set_session_data, \
+                mock.patch('app.utils.AddressIndex.get_ai_postcode') as mocked_get_ai_postcode:
+            mocked_get_session_data.return_value = session_addresses
+            mocked_set_session_data.return_value = stored
+            mocked_get_ai_postcode.return_value = self.ai_postcode_results
+            request = self.make_request()
+            address_content = await AddressIndex.get_postcode_return(request, self.postcode_valid, 'cy')
+
+        mocked_get_ai_postcode.assert_called_once_with(request, self.postcode_valid)
+        self.assertEqual(address_content['total_matches'], 27)
+        self.assertEqual(len(address_content['addresses']), 4)
+        self.assertEqual(address_content['addresses'][-1]['label']['text'], 'Ni allaf ddod o hyd i fy nghyfeiriad')
+        stored_addresses = mocked_set_session_data.call_args[0][2]
+        self.assertEqual(stored_addresses['postcode'], self.postcode_valid)
+        self.assertEqual(stored_addresses['addresses'][0], ['10023122451', '1 Gate Reach, Exeter, EX2 6GA'])
+
+    @unittest_run_loop
+    async def test_get_fulfilment_codes(self):
+        fulfilments = {'QUESTIONNAIRE': self.rhsvc_get_fulfilment_multi_post.result(),
+                       'LARGE_PRINT': self.rhsvc_get_fulfilment_single_post.result()}
+        started = []
+        all_started = asyncio.Event()
+
+        async def get_fulfilment(request, case_type, region, delivery_channel, product_group, individual):
+            # each lookup waits until every one has started, so lookups made one after another time out
+            started.append(product_group)
+            if len(started) == len(fulfilments):
+                all_started.set()
+            await asyncio.wait_for(all_started.wait(), 1)
+            return fulfilments[product_group]
+
+        with mock.patch('app.utils.RHService.get_fulfilment') as mocked_get_fulfilment:
+            mocked_get_fulfilment.side_effect = get_fulfilment
+            request = self.make_request()
+            fulfilment_codes = await RHService.get_fulfilment_codes(
+                request, 'HH', 'W', 'POST', ['QUESTIONNAIRE', 'LARGE_PRINT'], 'false', 'W')
+
+        self.assertEqual(mocked_get_fulfilment.call_count, 2)
+        mocked_get_fulfilment.assert_any_call(request, 'HH', 'W', 'POST', 'LARGE_PRINT', 'false')
+        self.assertEqual(fulfilment_codes, {
+            'QUESTIONNAIRE': ['P_OR_H2W'],
+            'LARGE_PRINT': [self.rhsvc_get_fulfilment_single_post.result()[0]['fulfilmentCode']]
+        })
+
+    @unittest_run_loop
+    async def test_get_fulfilment_codes_error(self):
+        error = asyncio.Future()
+        error.set_exception(ClientResponseError(mock.MagicMock(), (), status=429))
+        with mock.patch('app.utils.RHService.get_fulfilment') as mocked_get_fulfilment:
+            mocked_get_fulfilment.side_effect = [self.rhsvc_get_fulfilment_multi_post, error]
+            with self.assertRaises(ClientResponseError) as cm:
+                await RHService.get_fulfilment_codes(
+                    self.make_request(), 'HH', 'W', 'POST', ['QUESTIONNAIRE', 'CONTINUATION'], 'false', 'E')
+
+        self.assertEqual(cm.exception.status, 429)
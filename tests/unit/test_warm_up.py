@@ -0,0 +1,94 @@
+import asyncio
+
+import aiohttp_jinja2
+from aiohttp import ClientConnectionError, web
+from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+from aioresponses import aioresponses
+from jinja2 import DictLoader
+
+from app.http_clients import FallbackClient, UpstreamClient, UpstreamClients
+from app.warm_up import WarmUp
+
+TEMPLATES = {
+    'base.html': '<p>{% block content %}{% endblock %}</p>',
+    'start.html': "{% extends 'base.html' %}{% block content %}{{ display_region }} {{ locale }}{% endblock %}",
+    'broken.html': '{{ missing.attribute }}',
+    'components/_macro.njk': '{% macro greet(name) %}Hello {{ name }}{% endmacro %}',
+}
+
+
+class TestWarmUp(AioHTTPTestCase):
+
+    async def get_application(self):
+        app = web.Application()
+        app.update({
+            'DOMAIN_URL_PROTOCOL': 'http://',
+            'DOMAIN_URL_EN': 'localhost:9092',
+            'DOMAIN_URL_CY': 'localhost:9092',
+            'GTM_CONTAINER_ID': '',
+            'GTM_AUTH': '',
+        })
+        aiohttp_jinja2.setup(app, loader=DictLoader(TEMPLATES))
+        app.http_clients = UpstreamClients([UpstreamClient('rhsvc', 'http://rhsvc', 10, 5, 10, 5, 30)],
+                                           FallbackClient(10, 1, 10, 5, 30))
+        app.redis_pool = None
+        app.on_startup.append(app.http_clients.on_startup)
+        app.on_cleanup.append(app.http_clients.on_cleanup)
+        return app
+
+    def test_disabled(self):
+        warm_up = WarmUp(0, 4)
+        self.assertFalse(warm_up.enabled)
+        self.assertTrue(warm_up.done)
+
+    @unittest_run_loop
+    async def test_warm_up(self):
+        warm_up = WarmUp(5, 2)
+        self.assertFalse(warm_up.done)
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get('http://rhsvc/info', payload={'status': 'UP'}, repeat=True)
+            await warm_up.on_startup(self.app)
+            await warm_up._task
+        stats = warm_up.stats()
+        self.assertTrue(stats['done'])
+        # base.html and start.html in each region, broken.html failing in each
+        self.assertEqual(stats['pages'], 6)
+        self.assertEqual(stats['page_failures'], 3)
+        self.assertEqual(stats['connections_opened'], 2)
+        self.assertIsNotNone(stats['duration_ms'])
+
+    @unittest_run_loop
+    async def test_service_unavailable(self):
+        warm_up = WarmUp(5, 2)
+        with aioresponses(passthrough=[str(self.server._root)]) as mocked:
+            mocked.get('http://rhsvc/info', exception=ClientConnectionError(), repeat=True)
+            with self.assertLogs('respondent-home', 'WARNING'):
+                await warm_up.on_startup(self.app)
+                await warm_up._task
+        self.assertTrue(warm_up.done)
+        self.assertEqual(warm_up.connections_opened, 0)
+
+    @unittest_run_loop
+    async def test_timeout(self):
+        warm_up = WarmUp(0.01, 1)
+
+        async def slow(app):
+            await asyncio.sleep(1)
+
+        warm_up.render_pages = slow
+        with self.assertLogs('respondent-home', 'WARNING'):
+            await warm_up.on_startup(self.app)
+            await warm_up._task
+        self.assertTrue(warm_up.done)
+
+    @unittest_run_loop
+    async def test_cleanup_cancels(self):
+        warm_up = WarmUp(5, 1)
+
+        async def slow(app):
+            await asyncio.sleep(1)
+
+        warm_up.render_pages = slow
+        await warm_up.on_startup(self.app)
+        await warm_up.on_cleanup(self.app)
+        self.assertFalse(warm_up.done)